@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache import SolutionCache, solve_cached
+from novo import SearchLimitReached, create_solver
+
+
+def solver_from_spec(spec, backend='list'):
+    """
+    Constrói o solver a partir de uma especificação:
+    {'size': N, 'seed': S} gera o tabuleiro da semente S;
+    {'region_map': [...], 'constraints': [...]} carrega um tabuleiro pronto
+    (mapa em linhas, ou plano acompanhado de 'size').
+    """
+    if 'region_map' in spec:
+        return create_solver(spec.get('size', len(spec['region_map'])), backend=backend,
+                             region_map=spec['region_map'],
+                             constraints=spec['constraints'])
+    return create_solver(spec['size'], backend=backend, rng=random.Random(spec['seed']))
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def spec_problem(spec):
+    """
+    Motivo para recusar uma especificação antes de montar o solver (None se
+    estiver certa): size e seed inteiros, ou um mapa size x size (em linhas
+    ou plano) cujas regiões são todas índices válidos de constraints.
+    """
+    if not isinstance(spec, dict):
+        return "Especificação precisa ser um objeto"
+    if 'region_map' not in spec:
+        if not _is_int(spec.get('size')) or spec['size'] < 1 or not _is_int(spec.get('seed')):
+            return "Especificação precisa de 'size' e 'seed' inteiros, ou de 'region_map'"
+        return None
+
+    region_map = spec['region_map']
+    constraints = spec.get('constraints')
+    if not isinstance(region_map, list) or not region_map:
+        return "'region_map' precisa ser uma lista não vazia"
+    if not isinstance(constraints, list) or not all(_is_int(c) and c >= -1 for c in constraints):
+        return "'constraints' precisa ser uma lista de inteiros (-1 = sem número)"
+    size = spec.get('size', len(region_map))
+    if not _is_int(size) or size < 1:
+        return "'size' precisa ser um inteiro positivo"
+    if isinstance(region_map[0], list):
+        if len(region_map) != size or any(not isinstance(row, list) or len(row) != size
+                                          for row in region_map):
+            return "'region_map' precisa ter size linhas de size células"
+        cells = [region_id for row in region_map for region_id in row]
+    elif len(region_map) != size * size:
+        return "'region_map' plano precisa ter size * size células"
+    else:
+        cells = region_map
+    if not all(_is_int(region_id) and 0 <= region_id < len(constraints) for region_id in cells):
+        return "'region_map' com região fora de 'constraints'"
+    if len(set(cells)) != len(constraints):
+        return "Toda região precisa de pelo menos uma célula"
+    return None
+
+
+def solution_problem(solution, size):
+    """
+    Motivo para recusar uma solução antes de validá-la (None se a forma
+    estiver certa): precisa de size linhas de size células, todas 1 ou 2.
+    """
+    if not isinstance(solution, list) or len(solution) != size:
+        return "Solução ausente ou com tamanho errado"
+    if any(not isinstance(row, list) or len(row) != size for row in solution):
+        return "Solução com linhas de tamanho errado"
+    if any(isinstance(value, bool) or value not in (1, 2) for row in solution for value in row):
+        return "Solução incompleta ou com valores fora de 1 (branca) e 2 (preta)"
+    return None
+
+
+def solve_spec(index, spec, timeout=None, strategy='row-major', backend='list',
+               progress_interval=None, progress_callback=None, cache=None, node_limit=None,
+               corpus=None):
+    """
+    Resolve um puzzle (roda no processo worker) e retorna um dicionário de
+    resultado. timeout (segundos) e node_limit são limites cooperativos da
+    busca: estourar um deles dá status 'timeout' com o motivo em 'reason'.
+    Sem progress_interval a busca roda em modo silencioso; com um
+    SolutionCache, tabuleiros já vistos (em qualquer orientação) não são
+    resolvidos de novo. Com corpus (caminho), o tabuleiro e a solução são
+    acrescentados ao corpus binário (corpus.py) pelo próprio worker.
+    """
+    game = solver_from_spec(spec, backend)
+    game.set_progress(progress_interval, progress_callback)
+    game.set_limits(timeout, node_limit)
+
+    start_time = time.perf_counter()
+    cached = False
+    reason = None
+    try:
+        if cache is not None:
+            status, cached = solve_cached(game, cache, strategy)
+        else:
+            status = 'solved' if game.solve(strategy=strategy) else 'unsolvable'
+    except SearchLimitReached as limit:
+        status = 'timeout'
+        reason = limit.reason
+    elapsed = time.perf_counter() - start_time
+    if corpus is not None:
+        from corpus import append_solver
+        append_solver(corpus, game, status)
+
+    return {
+        'index': index,
+        'spec': spec,
+        'status': status,
+        'reason': reason,
+        'solution': [row[:] for row in game.grid] if status == 'solved' else None,
+        'attempts': game.attempts,
+        'backtracks': game.backtracks,
+        'time': elapsed,
+        'cached': cached,
+    }
+
+
+def solve_batch(specs, workers=None, timeout=None, strategy='row-major', backend='list',
+                cache=None, node_limit=None, corpus=None):
+    """
+    Resolve vários puzzles num ProcessPoolExecutor e produz os resultados
+    na ordem em que terminam (cada um traz o índice da especificação).
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_spec, index, spec, timeout, strategy, backend,
+                                   cache=cache, node_limit=node_limit, corpus=corpus)
+                   for index, spec in enumerate(specs)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def read_specs(stream):
+    """Lê especificações, uma por linha (JSON)"""
+    return [json.loads(line) for line in stream if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve puzzles Heyawake em lote")
+    parser.add_argument('--input', help="arquivo com uma especificação JSON por linha ('-' = stdin)")
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--count', type=int, default=100, help="puzzles gerados pelas sementes")
+    parser.add_argument('--seed-start', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--timeout', type=float, help="segundos por puzzle")
+    parser.add_argument('--node-limit', type=int, help="tentativas por puzzle")
+    parser.add_argument('--strategy', default='row-major')
+    parser.add_argument('--backend', default='list')
+    parser.add_argument('--cache', help="arquivo SQLite do cache de soluções")
+    parser.add_argument('--corpus', help="acrescenta tabuleiros e soluções a este corpus binário")
+    args = parser.parse_args()
+
+    if args.input == '-':
+        specs = read_specs(sys.stdin)
+    elif args.input:
+        with open(args.input) as f:
+            specs = read_specs(f)
+    else:
+        specs = [{'size': args.size, 'seed': seed}
+                 for seed in range(args.seed_start, args.seed_start + args.count)]
+
+    cache = SolutionCache(args.cache) if args.cache else None
+    start_time = time.perf_counter()
+    counts = {'solved': 0, 'unsolvable': 0, 'timeout': 0}
+    for result in solve_batch(specs, args.workers, args.timeout, args.strategy, args.backend,
+                              cache, args.node_limit, args.corpus):
+        counts[result['status']] += 1
+        print(json.dumps(result), flush=True)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{len(specs)} puzzles em {elapsed:.2f}s ({len(specs) / elapsed:.1f}/s) - "
+          + ", ".join(f"{k}: {v}" for k, v in counts.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from novo import BRANCHING_STRATEGIES, HeyawakeSolver, SearchLimitReached, create_solver
+
+# Corpus fixo do modo suite: (tamanho, semente, tem solução). Para cada
+# tamanho há um tabuleiro com solução e um sem solução difícil de refutar
+# (os que mais custam à busca row-major entre as sementes 0..59).
+PINNED_CORPUS = [
+    (4, 47, True), (4, 48, False),
+    (5, 48, True), (5, 27, False),
+    (6, 52, True), (6, 44, False),
+    (7, 44, True), (7, 36, False),
+    (8, 29, True), (8, 56, False),
+    (9, 2, True), (9, 27, False),
+    (10, 36, True), (10, 13, False), (10, 0, False),
+]
+
+# Configurações de solver comparadas pelo modo suite
+SUITE_CONFIGS = {
+    'row-major': {'strategy': 'row-major'},
+    'slack': {'strategy': 'slack'},
+    'bitboard': {'strategy': 'row-major', 'backend': 'bitboard'},
+    'transpositions': {'strategy': 'row-major', 'transpositions': 200000},
+}
+
+
+def build_puzzle(size, seed):
+    """Gera o mesmo tabuleiro para a mesma semente"""
+    return HeyawakeSolver(size, rng=random.Random(seed))
+
+
+def compare_strategies(sizes, seeds, strategies=None):
+    """
+    Resolve cada tabuleiro (tamanho, semente) com cada estratégia de
+    ramificação e retorna as linhas com nós explorados e tempo de parede.
+    """
+    strategies = strategies or list(BRANCHING_STRATEGIES)
+    rows = []
+    for size in sizes:
+        for seed in seeds:
+            for strategy in strategies:
+                game = build_puzzle(size, seed)
+                game.set_progress(None)
+                start_time = time.perf_counter()
+                solved = game.solve(strategy=strategy)
+                elapsed = time.perf_counter() - start_time
+                rows.append({
+                    'size': size,
+                    'seed': seed,
+                    'strategy': strategy,
+                    'solved': solved,
+                    'nodes': game.attempts,
+                    'backtracks': game.backtracks,
+                    'forced': game.forced,
+                    'branched': game.branched,
+                    'time': elapsed,
+                })
+    return rows
+
+
+def print_strategy_summary(rows):
+    """Totais por estratégia: nós e tempo somados sobre todas as sementes"""
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row['strategy'], {'nodes': 0, 'time': 0.0, 'solved': 0})
+        total['nodes'] += row['nodes']
+        total['time'] += row['time']
+        total['solved'] += row['solved']
+
+    print(f"{'Estratégia':<12} {'Nós':>12} {'Tempo (s)':>10} {'Resolvidos':>10}")
+    for strategy, total in totals.items():
+        print(f"{strategy:<12} {total['nodes']:>12,} {total['time']:>10.3f} {total['solved']:>10}")
+
+
+def compare_recursion(sizes, seeds, strategy='row-major'):
+    """
+    Resolve cada tabuleiro com solve() e solve_iterative(), confere que a
+    busca é idêntica (resultado, grade e contadores) e mede o custo por nó.
+    """
+    totals = {'recursive': [0, 0.0], 'iterative': [0, 0.0]}
+    for size in sizes:
+        for seed in seeds:
+            outcomes = []
+            for mode in totals:
+                game = build_puzzle(size, seed)
+                game.set_progress(None)
+                start_time = time.perf_counter()
+                if mode == 'recursive':
+                    solved = game.solve(strategy=strategy)
+                else:
+                    solved = game.solve_iterative(strategy=strategy)
+                totals[mode][0] += game.attempts
+                totals[mode][1] += time.perf_counter() - start_time
+                outcomes.append((solved, game.grid, game.attempts, game.backtracks,
+                                 game.forced, game.branched))
+            if outcomes[0] != outcomes[1]:
+                raise AssertionError(f"Busca divergente em {size}x{size}, semente {seed}")
+    return totals
+
+
+def print_recursion_summary(totals):
+    print(f"{'Modo':<12} {'Nós':>12} {'Tempo (s)':>10} {'µs/nó':>10}")
+    for mode, (nodes, elapsed) in totals.items():
+        per_node = elapsed / nodes * 1e6 if nodes else 0.0
+        print(f"{mode:<12} {nodes:>12,} {elapsed:>10.3f} {per_node:>10.1f}")
+
+
+def compare_transpositions(sizes, seeds, capacities):
+    """
+    Resolve cada tabuleiro sem tabela de transposição e com cada
+    capacidade, somando nós, tempo e os contadores da tabela.
+    """
+    totals = {capacity: {'nodes': 0, 'time': 0.0, 'hits': 0, 'misses': 0, 'evictions': 0}
+              for capacity in [None] + list(capacities)}
+    for size in sizes:
+        for seed in seeds:
+            for capacity, total in totals.items():
+                game = build_puzzle(size, seed)
+                game.use_transposition_table(capacity)
+                game.set_progress(None)
+                start_time = time.perf_counter()
+                game.solve()
+                total['time'] += time.perf_counter() - start_time
+                total['nodes'] += game.attempts
+                if game.transpositions is not None:
+                    for counter in ('hits', 'misses', 'evictions'):
+                        total[counter] += getattr(game.transpositions, counter)
+    return totals
+
+
+def print_transposition_summary(totals):
+    print(f"{'Capacidade':<12} {'Nós':>12} {'Tempo (s)':>10} {'Acertos':>10} "
+          f"{'Falhas':>10} {'Descartes':>10}")
+    for capacity, total in totals.items():
+        label = 'sem tabela' if capacity is None else f"{capacity:,}"
+        print(f"{label:<12} {total['nodes']:>12,} {total['time']:>10.3f} {total['hits']:>10,} "
+              f"{total['misses']:>10,} {total['evictions']:>10,}")
+
+
+def compare_memory(sizes, seeds, node_limit=20000):
+    """
+    Memória por tabuleiro (tracemalloc) como HeyawakeSolver e como
+    CompactBoard: bytes por instância guardada, mantendo todas vivas, e o
+    maior pico ao montar e resolver um tabuleiro de cada vez (a busca do
+    CompactBoard roda nos próprios buffers).
+    """
+    from compact import CompactBoard
+
+    rows = []
+    for size in sizes:
+        specs = [build_puzzle(size, seed).export_puzzle() for seed in seeds]
+        for name, build in [('HeyawakeSolver', HeyawakeSolver), ('CompactBoard', CompactBoard)]:
+            build(size, region_map=specs[0]['region_map'], constraints=specs[0]['constraints'])
+            tracemalloc.start()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            kept = [build(size, region_map=spec['region_map'], constraints=spec['constraints'])
+                    for spec in specs]
+            used = tracemalloc.get_traced_memory()[0] - start_bytes
+            tracemalloc.stop()
+            del kept
+
+            search_peak = 0
+            for spec in specs:
+                # Uma vez sem tracemalloc para aquecer, outra medida (como em run_suite)
+                for traced in (False, True):
+                    if traced:
+                        tracemalloc.start()
+                    board = build(size, region_map=spec['region_map'],
+                                  constraints=spec['constraints'])
+                    try:
+                        if name == 'HeyawakeSolver':
+                            board.set_progress(None)
+                            board.limit_nodes(node_limit)
+                            board.solve()
+                        else:
+                            board.solve(node_limit)
+                    except SearchLimitReached:
+                        pass
+                    if traced:
+                        search_peak = max(search_peak, tracemalloc.get_traced_memory()[1])
+                        tracemalloc.stop()
+                    del board
+            rows.append({'size': size, 'state': name, 'instances': len(specs),
+                         'bytes_per_instance': used // len(specs), 'search_peak': search_peak})
+    return rows
+
+
+def print_memory_summary(rows):
+    print(f"{'Tamanho':>8} {'Estado':<16} {'Bytes/instância':>16} {'Redução':>8} "
+          f"{'Pico na busca':>14} {'Redução':>8}")
+    reference = {}
+    for row in rows:
+        stored, peak = reference.setdefault(row['size'], (row['bytes_per_instance'], row['search_peak']))
+        print(f"{row['size']:>8} {row['state']:<16} {row['bytes_per_instance']:>16,} "
+              f"{stored / row['bytes_per_instance']:>7.1f}x {row['search_peak']:>14,} "
+              f"{peak / row['search_peak']:>7.1f}x")
+
+
+def run_config(size, seed, config, node_limit=None, measure_memory=False):
+    """Resolve um tabuleiro do corpus com uma configuração; retorna as medidas"""
+    game = create_solver(size, backend=config.get('backend', 'list'), rng=random.Random(seed))
+    game.set_progress(None)
+    game.limit_nodes(node_limit)
+    if config.get('transpositions'):
+        game.use_transposition_table(config['transpositions'])
+
+    if measure_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        solved = game.solve(strategy=config.get('strategy', 'row-major'))
+    except SearchLimitReached:
+        solved = None
+    elapsed = time.perf_counter() - start_time
+    peak = 0
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return solved, game, elapsed, peak
+
+
+def run_suite(configs, corpus=PINNED_CORPUS, repeat=1, node_limit=None, memory=True):
+    """
+    Mede cada configuração em cada tabuleiro do corpus: melhor tempo de
+    parede em repeat execuções, nós, backtracks, nós/s e pico de memória
+    (numa execução separada com tracemalloc, que distorceria o tempo).
+    """
+    rows = []
+    for name in configs:
+        config = SUITE_CONFIGS[name]
+        for size, seed, expected in corpus:
+            best = None
+            for _ in range(repeat):
+                solved, game, elapsed, _ = run_config(size, seed, config, node_limit)
+                best = elapsed if best is None else min(best, elapsed)
+            peak = None
+            if memory:
+                # Aquecimento sem tracemalloc: o primeiro pico medido no processo
+                # também contaria alocações únicas do interpretador
+                run_config(size, seed, config, node_limit)
+                peak = run_config(size, seed, config, node_limit, measure_memory=True)[3]
+            rows.append({
+                'board': f"{size}-{seed}",
+                'config': name,
+                'solved': solved,
+                'expected': expected,
+                'attempts': game.attempts,
+                'backtracks': game.backtracks,
+                'time': best,
+                'nodes_per_sec': game.attempts / best if best else 0.0,
+                'peak_memory': peak,
+            })
+    return rows
+
+
+def suite_report(rows):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': rows,
+    }
+
+
+def compare_to_baseline(rows, baseline, tolerance=0.2, min_time=0.005):
+    """
+    Lista as regressões em relação a um relatório anterior: veredito
+    errado ou diferente, mais nós, ou tempo/memória acima da tolerância relativa
+    (tempos abaixo de min_time são ruído e não contam).
+    """
+    previous = {(row['board'], row['config']): row for row in baseline['results']}
+    regressions = []
+    for row in rows:
+        old = previous.get((row['board'], row['config']))
+        if old is None:
+            continue
+        key = f"{row['config']} {row['board']}"
+        if row['solved'] is not None and row['solved'] != row['expected']:
+            regressions.append(f"{key}: veredito errado ({row['solved']})")
+        elif row['solved'] != old['solved']:
+            regressions.append(f"{key}: veredito {old['solved']} → {row['solved']}")
+        if row['attempts'] > old['attempts']:
+            regressions.append(f"{key}: nós {old['attempts']:,} → {row['attempts']:,}")
+        if row['time'] > max(old['time'], min_time) * (1 + tolerance):
+            regressions.append(f"{key}: tempo {old['time']:.3f}s → {row['time']:.3f}s")
+        if row['peak_memory'] and old.get('peak_memory') and \
+                row['peak_memory'] > old['peak_memory'] * (1 + tolerance):
+            regressions.append(f"{key}: memória {old['peak_memory']:,} → {row['peak_memory']:,} bytes")
+    return regressions
+
+
+def print_suite_summary(rows):
+    print(f"{'Config':<15} {'Tabuleiro':<9} {'Resolvido':>9} {'Nós':>10} {'Backtracks':>10} "
+          f"{'Tempo (s)':>10} {'Nós/s':>10} {'Pico (KiB)':>10}")
+    for row in rows:
+        verdict = 'limite' if row['solved'] is None else str(row['solved'])
+        if row['solved'] is not None and row['solved'] != row['expected']:
+            verdict += '!'
+        peak = f"{row['peak_memory'] / 1024:,.0f}" if row['peak_memory'] is not None else '-'
+        print(f"{row['config']:<15} {row['board']:<9} {verdict:>9} {row['attempts']:>10,} "
+              f"{row['backtracks']:>10,} {row['time']:>10.3f} {row['nodes_per_sec']:>10,.0f} {peak:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do solver Heyawake")
+    parser.add_argument('mode', nargs='?', choices=['strategies', 'recursion', 'transpositions', 'suite',
+                                                     'memory'],
+                        default='strategies')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--seeds', type=int, default=20, help="sementes 0..N-1")
+    parser.add_argument('--strategies', nargs='+', choices=list(BRANCHING_STRATEGIES))
+    parser.add_argument('--capacities', type=int, nargs='+', default=[1000, 20000, 200000],
+                        help="capacidades da tabela de transposição")
+    parser.add_argument('--configs', nargs='+', choices=list(SUITE_CONFIGS),
+                        default=list(SUITE_CONFIGS), help="configurações do modo suite")
+    parser.add_argument('--repeat', type=int, default=1, help="execuções por medida de tempo")
+    parser.add_argument('--node-limit', type=int, default=500000)
+    parser.add_argument('--no-memory', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--output', help="grava o relatório JSON do modo suite")
+    parser.add_argument('--baseline', help="relatório anterior para detectar regressões (ex.: benchmark_baseline.json)")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.mode == 'recursion':
+        print_recursion_summary(compare_recursion(args.sizes, range(args.seeds)))
+    elif args.mode == 'suite':
+        rows = run_suite(args.configs, repeat=args.repeat, node_limit=args.node_limit,
+                         memory=not args.no_memory)
+        print_suite_summary(rows)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(suite_report(rows), f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare_to_baseline(rows, json.load(f), args.tolerance)
+            for regression in regressions:
+                print(f"REGRESSÃO {regression}")
+            if regressions:
+                sys.exit(1)
+    elif args.mode == 'memory':
+        print_memory_summary(compare_memory(args.sizes, range(args.seeds)))
+    elif args.mode == 'transpositions':
+        totals = compare_transpositions(args.sizes, range(args.seeds), args.capacities)
+        print_transposition_summary(totals)
+    else:
+        rows = compare_strategies(args.sizes, range(args.seeds), args.strategies)
+        print_strategy_summary(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from novo import HeyawakeSolver
+
+# Backend de estado em bitboards: cada conjunto de células (pretas, brancas,
+# uma região, ...) é um inteiro Python com o bit r * size + c ligado. A busca
+# lê só as máscaras, os contadores das regiões e o union-find da REGRA 2; a
+# grade em listas continua sendo escrita para validate_solution, display e
+# export_puzzle, mas não é consultada no caminho quente.
+
+
+class BitboardHeyawakeSolver(HeyawakeSolver):
+    """Mesmo solver, mas com as verificações da busca feitas por máscaras de bits"""
+
+    def load_regions(self, region_map, constraints, index=None):
+        super().load_regions(region_map, constraints, index)
+        self.black = 0
+        self.white = 0
+        self.build_masks()
+
+    def build_masks(self):
+        """Pré-calcula máscaras de regiões, vizinhança, bordas e janelas"""
+        size = self.size
+        self.full_mask = (1 << (size * size)) - 1
+
+        first_col = 0
+        for i in range(size):
+            first_col |= 1 << (i * size)
+        self.not_first_col = self.full_mask & ~first_col
+        self.not_last_col = self.full_mask & ~(first_col << (size - 1))
+
+        self.neighbour_masks = []
+        for neighbours in self.index.neighbours:
+            mask = 0
+            for nr, nc in neighbours:
+                mask |= 1 << (nr * size + nc)
+            self.neighbour_masks.append(mask)
+
+        self.region_masks = []
+        for region in self.regions:
+            mask = 0
+            for r, c in region['cells']:
+                mask |= 1 << (r * size + c)
+            self.region_masks.append(mask)
+
+        # Regiões cuja REGRA 5 pode mudar ao atribuir cada célula
+        self.touched_regions = []
+        for pos, neighbours in enumerate(self.index.neighbours):
+            touched = {self.region_map[pos // size][pos % size]}
+            touched.update(self.region_map[nr][nc] for nr, nc in neighbours)
+            self.touched_regions.append(tuple(touched))
+
+        self.window_masks = []
+        self.window_masks_by_cell = [[] for _ in range(size * size)]
+        for window in self.index.windows:
+            mask = 0
+            for pos in window:
+                mask |= 1 << pos
+            self.window_masks.append(mask)
+            for pos in window:
+                self.window_masks_by_cell[pos].append(mask)
+
+    def sync_state(self):
+        super().sync_state()
+        self.black = 0
+        self.white = 0
+        for i in range(self.size):
+            for j in range(self.size):
+                if self.grid[i][j] == 2:
+                    self.black |= 1 << (i * self.size + j)
+                elif self.grid[i][j] == 1:
+                    self.white |= 1 << (i * self.size + j)
+
+    def set_cell(self, row, col, value):
+        super().set_cell(row, col, value)
+        bit = 1 << (row * self.size + col)
+        if value == 2:
+            self.black |= bit
+        elif value == 1:
+            self.white |= bit
+
+    def clear_cell(self, row, col):
+        super().clear_cell(row, col)
+        bit = ~(1 << (row * self.size + col))
+        self.black &= bit
+        self.white &= bit
+
+    def is_valid_placement(self, row, col, value):
+        """REGRA 1: nenhum vizinho ortogonal já é preto"""
+        if value == 2:
+            return not (self.black & self.neighbour_masks[row * self.size + col])
+        return True
+
+    def check_no_adjacent_blacks(self):
+        """REGRA 1: pares horizontais (sem atravessar a borda) e verticais"""
+        black = self.black
+        horizontal = black & (black << 1) & self.not_first_col
+        vertical = black & (black << self.size)
+        return not (horizontal | vertical)
+
+    def check_region_constraint(self, region_id):
+        """REGRA 3: contagem por popcount (parcial/preditiva)"""
+        constraint = self.regions[region_id]['constraint']
+        if constraint < 0:
+            return True
+        mask = self.region_masks[region_id]
+        black_count = (self.black & mask).bit_count()
+        if black_count > constraint:
+            return False
+        empty_count = (mask & ~(self.black | self.white)).bit_count()
+        return black_count + empty_count >= constraint
+
+    def check_final_constraints(self):
+        for region, mask in zip(self.regions, self.region_masks):
+            if region['constraint'] >= 0:
+                if (self.black & mask).bit_count() != region['constraint']:
+                    return False
+        return True
+
+    def check_white_line_regions_partial(self, r, c):
+        """REGRA 4: só as janelas que contêm a célula podem ter sido completadas"""
+        if not (self.white >> (r * self.size + c)) & 1:
+            return True
+        white = self.white
+        for mask in self.window_masks_by_cell[r * self.size + c]:
+            if white & mask == mask:
+                return False
+        return True
+
+    def check_white_line_regions_final(self):
+        white = self.white
+        for mask in self.window_masks:
+            if white & mask == mask:
+                return False
+        return True
+
+    def white_run_ok(self, row, col):
+        """REGRA 4 preditiva: nenhuma janela da célula ficaria toda branca"""
+        white = self.white | 1 << (row * self.size + col)
+        for mask in self.window_masks_by_cell[row * self.size + col]:
+            if white & mask == mask:
+                return False
+        return True
+
+    def spread(self, cells):
+        """cells mais os vizinhos ortogonais de cada célula"""
+        size = self.size
+        return (cells | (cells << 1) & self.not_first_col | (cells >> 1) & self.not_last_col |
+                (cells << size) & self.full_mask | cells >> size)
+
+    def check_white_connectivity_final(self):
+        """REGRA 2: inundação só pelas brancas, a partir da menor"""
+        white = self.white
+        if not white:
+            return False
+        reach = white & -white
+        while True:
+            grown = self.spread(reach) & white
+            if grown == reach:
+                return reach == white
+            reach = grown
+
+    def region_can_exit(self, region_id):
+        """REGRA 5 para uma região: inundação pelas não-pretas a partir da primeira branca"""
+        mask = self.region_masks[region_id]
+        whites = self.white & mask
+        if not whites:
+            return True
+        open_cells = self.full_mask & ~self.black
+        reach = whites & -whites
+        while True:
+            grown = self.spread(reach) & open_cells
+            if grown & ~mask:
+                return True
+            if grown == reach:
+                return False
+            reach = grown
+
+    def check_region_isolation_at(self, row, col):
+        return all(self.region_can_exit(region_id)
+                   for region_id in self.touched_regions[row * self.size + col])
+
+    def select_row_major(self, start):
+        """Menor bit vazio a partir de start"""
+        empty = (self.full_mask & ~(self.black | self.white)) >> start
+        if not empty:
+            return None
+        return start + (empty & -empty).bit_length() - 1
+
+    def propagate(self):
+        """Mesmo ponto fixo de HeyawakeSolver.propagate, percorrendo só os bits vazios"""
+        size = self.size
+        changed = True
+        while changed:
+            changed = False
+            empty = self.full_mask & ~(self.black | self.white)
+            while empty:
+                low = empty & -empty
+                empty ^= low
+                pos = low.bit_length() - 1
+                value = self.forced_value(pos // size, pos % size)
+                if value is None:
+                    continue
+                if value == 0 or not self.try_assign(pos // size, pos % size, value):
+                    return False
+                self.forced += 1
+                changed = True
+        return True
@@ -0,0 +1,291 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+# Validação em lote com NumPy (dependência opcional, só deste módulo): as
+# regras de validate_solution aplicadas a uma pilha (N, size, size) de
+# grades de uma vez. O resultado é uma máscara (N, 5): coluna k = REGRA k+1
+# satisfeita, na mesma numeração de validate_solution.
+
+BLACK = 2
+WHITE = 1
+
+
+def _stack(values, count, ndim):
+    """Repete um valor compartilhado (sem o eixo N) para todos os tabuleiros"""
+    array = np.asarray(values)
+    if array.ndim == ndim - 1:
+        array = np.broadcast_to(array, (count,) + array.shape)
+    return array
+
+
+def pad_constraints(constraints):
+    """Lista de listas de números (tamanhos diferentes) → matriz (N, R) completada com -1"""
+    width = max(len(row) for row in constraints)
+    padded = np.full((len(constraints), width), -1, dtype=np.int16)
+    for k, row in enumerate(constraints):
+        padded[k, :len(row)] = row
+    return padded
+
+
+def check_adjacency(black):
+    """REGRA 1: nenhum par de pretas vizinhas (deslocamentos da grade)"""
+    horizontal = (black[:, :, 1:] & black[:, :, :-1]).any(axis=(1, 2))
+    vertical = (black[:, 1:, :] & black[:, :-1, :]).any(axis=(1, 2))
+    return ~(horizontal | vertical)
+
+
+def _pack_rows(cells):
+    """(N, size, size) bool → (N, size) uint64: bit j da linha i = célula (i, j)"""
+    count, size, _ = cells.shape
+    packed = np.packbits(cells, axis=2, bitorder='little')
+    buffer = np.zeros((count, size, 8), dtype=np.uint8)
+    buffer[:, :, :packed.shape[2]] = packed
+    return buffer.view('<u8')[:, :, 0].astype(np.uint64)
+
+
+def _unpack_rows(rows, size):
+    """Inverso de _pack_rows"""
+    data = rows.astype('<u8').view(np.uint8).reshape(rows.shape + (8,))
+    return np.unpackbits(data, axis=2, count=size, bitorder='little').astype(bool)
+
+
+def _spread_rows(reach, across, size):
+    """
+    Estende reach ao longo das linhas pelas ligações across (bit j = célula
+    j ligada à j-1), nos dois sentidos, em log2(size) deslocamentos.
+    """
+    for pro, shift_op in ((across, np.left_shift), (across >> 1, np.right_shift)):
+        shift = 1
+        while shift < size:
+            reach = reach | (pro & shift_op(reach, shift))
+            pro = pro & shift_op(pro, shift)
+            shift *= 2
+    return reach
+
+
+def _spread_columns(reach, down, size):
+    """Como _spread_rows, entre linhas: down[i] = células da linha i ligadas à i-1"""
+    reach = reach.copy()
+    pro = down.copy()
+    shift = 1
+    while shift < size:
+        reach[shift:] |= pro[shift:] & reach[:-shift]
+        pro[shift:] &= pro[:-shift]
+        shift *= 2
+    pro = np.zeros_like(down)
+    pro[:-1] = down[1:]
+    shift = 1
+    while shift < size:
+        reach[:-shift] |= pro[:-shift] & reach[shift:]
+        pro[:-shift] &= pro[shift:]
+        shift *= 2
+    return reach
+
+
+def flood(seeds, across, down):
+    """
+    Células alcançáveis a partir de seeds pelas ligações, em máscaras de
+    linha (N, size): cada rodada cobre trechos retos inteiros, então o número
+    de rodadas acompanha as curvas do caminho, não o comprimento.
+    """
+    size = seeds.shape[1]
+    # Linha na frente: cada fatia reach[i] é contígua para todos os tabuleiros
+    reach, across, down = (np.ascontiguousarray(rows.T) for rows in (seeds, across, down))
+    while True:
+        spread = _spread_columns(_spread_rows(reach, across, size), down, size)
+        if np.array_equal(spread, reach):
+            return reach.T
+        reach = spread
+
+
+def _links(rows, same=None):
+    """Ligações (across, down) entre células vizinhas de rows, opcionalmente só onde same"""
+    across = rows & (rows << np.uint64(1))
+    down = np.zeros_like(rows)
+    down[:, 1:] = rows[:, 1:] & rows[:, :-1]
+    if same is not None:
+        across &= same[0]
+        down &= same[1]
+    return across, down
+
+
+def check_connectivity(white_rows):
+    """REGRA 2: há brancas e a inundação a partir da primeira branca cobre todas"""
+    count = white_rows.shape[0]
+    occupied = white_rows != 0
+    first_row = occupied.argmax(axis=1)
+    boards = np.arange(count)
+    row = white_rows[boards, first_row]
+    seeds = np.zeros_like(white_rows)
+    seeds[boards, first_row] = row & (~row + np.uint64(1))
+    reach = flood(seeds, *_links(white_rows))
+    return occupied.any(axis=1) & (reach == white_rows).all(axis=1)
+
+
+def check_region_counts(black, region_maps, constraints):
+    """REGRA 3: bincount das pretas por (tabuleiro, região) contra os números"""
+    count, width = constraints.shape
+    keys = (np.arange(count)[:, None, None] * width + region_maps).ravel()
+    blacks = np.bincount(keys, weights=black.ravel(), minlength=count * width)
+    blacks = blacks.reshape(count, width)
+    return ((constraints < 0) | (blacks == constraints)).all(axis=1)
+
+
+def _runs_over_two_regions(white, region_maps):
+    """
+    Tabuleiros com alguma sequência branca horizontal que toca 3+ regiões:
+    varredura coluna a coluna guardando a primeira e a segunda região da
+    sequência corrente de cada linha (como CompactBoard.check_white_line_regions).
+    """
+    count, size, _ = white.shape
+    # Coluna na frente, para cada passo ler fatias contíguas
+    white = np.ascontiguousarray(white.transpose(2, 0, 1))
+    region_maps = np.ascontiguousarray(region_maps.transpose(2, 0, 1), dtype=np.int32)
+    first = np.full((count, size), -1, dtype=np.int32)
+    second = first.copy()
+    bad = np.zeros((count, size), dtype=bool)
+    for j in range(size):
+        cells = white[j]
+        region = region_maps[j]
+        known = (region == first) | (region == second)
+        bad |= cells & (second >= 0) & ~known
+        second = np.where(cells & (first >= 0) & (second < 0) & ~known, region, second)
+        first = np.where(cells & (first < 0), region, first)
+        first[~cells] = -1
+        second[~cells] = -1
+    return bad.any(axis=1)
+
+
+def check_line_regions(white, region_maps):
+    """REGRA 4: em linhas e colunas, nenhuma sequência branca cruza mais de 2 regiões"""
+    rows = _runs_over_two_regions(white, region_maps)
+    columns = _runs_over_two_regions(white.transpose(0, 2, 1), region_maps.transpose(0, 2, 1))
+    return ~(rows | columns)
+
+
+def check_region_isolation(white, open_rows, region_maps, regions):
+    """
+    REGRA 5: para cada região com brancas, a primeira branca (ordem linha a
+    linha) alcança, pelas abertas da própria região, uma aberta de outra
+    região. Todas as regiões inundam juntas: ligações só dentro da região
+    não deixam uma inundação invadir a outra.
+    """
+    count, size, _ = white.shape
+    total = size * size
+    same_across = np.zeros(white.shape, dtype=bool)
+    same_across[:, :, 1:] = region_maps[:, :, 1:] == region_maps[:, :, :-1]
+    same_down = np.zeros(white.shape, dtype=bool)
+    same_down[:, 1:] = region_maps[:, 1:] == region_maps[:, :-1]
+    same = (_pack_rows(same_across), _pack_rows(same_down))
+    inner = _links(open_rows, same)
+    across, down = _links(open_rows)
+    across &= ~same[0]
+    down &= ~same[1]
+
+    # Células abertas com vizinha aberta de outra região
+    exits = across | (across >> np.uint64(1)) | down
+    exits[:, :-1] |= down[:, 1:]
+
+    # Primeira branca de cada (tabuleiro, região)
+    keys = (np.arange(count)[:, None] * regions + region_maps.reshape(count, total))
+    flat_white = white.reshape(count, total)
+    cells = np.broadcast_to(np.arange(total), flat_white.shape)
+    first = np.full(count * regions, total, dtype=np.int64)
+    np.minimum.at(first, keys[flat_white], cells[flat_white])
+    has_white = first < total
+    seeds = np.zeros((count, total), dtype=bool)
+    seeds[np.flatnonzero(has_white) // regions, first[has_white]] = True
+
+    reach = flood(_pack_rows(seeds.reshape(white.shape)), *inner)
+    escaped = _unpack_rows(reach & exits, size).reshape(count, total)
+    escapes = np.zeros(count * regions, dtype=bool)
+    escapes[keys[escaped]] = True
+    return (escapes | ~has_white).reshape(count, regions).all(axis=1)
+
+
+def validate_batch(grids, region_maps, constraints):
+    """
+    Valida N grades de uma vez. grids: (N, size, size) com 0/1/2;
+    region_maps: (N, size, size) ou um mapa (size, size) compartilhado;
+    constraints: (N, R) ou (R,), -1 = sem número (listas de tamanhos
+    diferentes podem passar por pad_constraints). Retorna a máscara (N, 5).
+    """
+    grids = np.asarray(grids, dtype=np.int8)
+    count = grids.shape[0]
+    if grids.shape[2] > 64:
+        raise ValueError("Só tabuleiros de até 64 colunas (cada linha vira um uint64)")
+    region_maps = np.ascontiguousarray(_stack(region_maps, count, 3), dtype=np.int64)
+    constraints = _stack(constraints, count, 2)
+    regions = max(int(region_maps.max()) + 1, constraints.shape[1])
+    if constraints.shape[1] < regions:
+        constraints = np.pad(constraints, ((0, 0), (0, regions - constraints.shape[1])),
+                             constant_values=-1)
+
+    black = grids == BLACK
+    white = grids == WHITE
+    white_rows = _pack_rows(white)
+    open_rows = _pack_rows(~black)
+
+    mask = np.empty((count, 5), dtype=bool)
+    mask[:, 0] = check_adjacency(black)
+    mask[:, 1] = check_connectivity(white_rows)
+    mask[:, 2] = check_region_counts(black, region_maps, constraints)
+    mask[:, 3] = check_line_regions(white, region_maps)
+    mask[:, 4] = check_region_isolation(white, open_rows, region_maps, regions)
+    return mask
+
+
+def first_failure(mask):
+    """Primeira regra violada de cada tabuleiro (0 = válido), como em validate_solution"""
+    failed = ~mask
+    return np.where(failed.any(axis=1), failed.argmax(axis=1) + 1, 0)
+
+
+def validate_records(records):
+    """
+    Valida registros {'spec' ou tabuleiro, 'solution'} (saída de cli.py
+    solve), agrupando por tamanho. Retorna [(índice, máscara da linha)].
+    """
+    from batch import solver_from_spec
+
+    groups = {}
+    for index, record in enumerate(records):
+        solution = record.get('solution') or record.get('grid')
+        if solution is None:
+            continue
+        game = solver_from_spec(record.get('spec', record))
+        groups.setdefault(game.size, []).append(
+            (index, solution, game.region_map, [region['constraint'] for region in game.regions]))
+
+    results = []
+    for entries in groups.values():
+        indexes, grids, maps, numbers = zip(*entries)
+        mask = validate_batch(np.array(grids), np.array(maps), pad_constraints(numbers))
+        results.extend(zip(indexes, mask.tolist()))
+    return sorted(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida soluções Heyawake em lote com NumPy")
+    parser.add_argument('--input', '-i', default='-', help="NDJSON com 'solution' ('-' = stdin)")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    records = [json.loads(line) for line in stream if line.strip()]
+    start_time = time.perf_counter()
+    results = validate_records(records)
+    elapsed = time.perf_counter() - start_time
+    invalid = 0
+    for index, mask in results:
+        if not all(mask):
+            invalid += 1
+            print(json.dumps({'index': index, 'rules': mask}))
+    print(f"{len(results)} soluções em {elapsed:.3f}s - inválidas: {invalid}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+
+from novo import create_solver
+
+# Cache persistente de resultados. Tabuleiros que só diferem por rotação,
+# reflexão ou numeração das regiões têm a mesma forma canônica, e a solução
+# fica guardada nessa orientação; na leitura ela é levada de volta para a
+# orientação de quem perguntou.
+
+# As 8 simetrias do quadrado, como célula de destino (i, j) → célula de origem
+SYMMETRIES = [
+    lambda i, j, n: (i, j),
+    lambda i, j, n: (j, n - 1 - i),
+    lambda i, j, n: (n - 1 - i, n - 1 - j),
+    lambda i, j, n: (n - 1 - j, i),
+    lambda i, j, n: (i, n - 1 - j),
+    lambda i, j, n: (n - 1 - i, j),
+    lambda i, j, n: (j, i),
+    lambda i, j, n: (n - 1 - j, n - 1 - i),
+]
+
+_sources = {}
+
+
+def symmetry_sources(size):
+    """Para cada simetria, a posição de origem de cada posição de destino (em cache)"""
+    if size not in _sources:
+        _sources[size] = [[symmetry(i, j, size)[0] * size + symmetry(i, j, size)[1]
+                           for i in range(size) for j in range(size)]
+                          for symmetry in SYMMETRIES]
+    return _sources[size]
+
+
+def canonical_form(size, region_map, constraints):
+    """
+    Forma canônica do tabuleiro: entre as 8 simetrias, com as regiões
+    renumeradas por ordem de primeira aparição, a menor (mapa, números).
+    Retorna (mapa canônico plano, números canônicos, índice da simetria).
+    """
+    if isinstance(region_map[0], (list, tuple)):
+        flat = [region_id for row in region_map for region_id in row]
+    else:
+        flat = list(region_map)
+
+    best = None
+    for index, sources in enumerate(symmetry_sources(size)):
+        names = {}
+        canonical = tuple(names.setdefault(flat[pos], len(names)) for pos in sources)
+        numbers = tuple(constraints[region_id] for region_id in names)
+        if best is None or (canonical, numbers) < best[:2]:
+            best = (canonical, numbers, index)
+    return best
+
+
+def fingerprint(size, region_map, constraints):
+    """SHA-1 da forma canônica e a simetria que leva o tabuleiro até ela"""
+    canonical, numbers, index = canonical_form(size, region_map, constraints)
+    text = f"{size}:{','.join(map(str, canonical))}|{','.join(map(str, numbers))}"
+    return hashlib.sha1(text.encode()).hexdigest(), index
+
+
+def to_canonical(size, grid, index):
+    """Grade na orientação do chamador → bytes na orientação canônica"""
+    return bytes(grid[pos // size][pos % size] for pos in symmetry_sources(size)[index])
+
+
+def from_canonical(size, data, index):
+    """Bytes na orientação canônica → grade na orientação do chamador"""
+    grid = [[0] * size for _ in range(size)]
+    for target, pos in enumerate(symmetry_sources(size)[index]):
+        grid[pos // size][pos % size] = data[target]
+    return grid
+
+
+class SolutionCache:
+    """
+    Resultados em SQLite (modo WAL, seguro entre processos) com no máximo
+    max_entries linhas; as menos usadas recentemente saem primeiro, em lotes
+    de evict_batch. Cada processo mantém uma contagem aproximada e só faz
+    COUNT(*) quando ela passa do limite, então com vários workers o cache
+    pode passar um pouco de max_entries entre duas conferências. Os acertos
+    atualizam last_used em lotes de touch_batch. A conexão é aberta por
+    processo, então o objeto pode ir para workers.
+    """
+
+    def __init__(self, path, max_entries=100000, timeout=30.0, evict_batch=None, touch_batch=64):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.evict_batch = evict_batch or max(1, max_entries // 100)
+        self.touch_batch = touch_batch
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+        self._count = None
+        self._touched = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+        state['_count'] = None
+        state['_touched'] = {}
+        return state
+
+    @property
+    def connection(self):
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""CREATE TABLE IF NOT EXISTS solutions (
+                                      fingerprint TEXT PRIMARY KEY,
+                                      size INTEGER NOT NULL,
+                                      status TEXT NOT NULL,
+                                      solution BLOB,
+                                      last_used REAL NOT NULL)""")
+            connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used "
+                               "ON solutions (last_used)")
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+            self._count = None
+            self._touched = {}
+        return self._connection
+
+    def get(self, key):
+        """(status, solução canônica ou None), ou None se não estiver no cache"""
+        row = self.connection.execute("SELECT status, solution FROM solutions WHERE fingerprint = ?",
+                                      (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.touch_batch:
+            with self.connection as connection:
+                self._flush_touched(connection)
+        return row
+
+    def _flush_touched(self, connection):
+        """Grava o last_used dos acertos pendentes numa única transação"""
+        if self._touched:
+            connection.executemany("UPDATE solutions SET last_used = ? WHERE fingerprint = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+
+    def put(self, key, size, status, solution=None):
+        with self.connection as connection:
+            connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                               (key, size, status, solution, time.time()))
+            if self._count is None:
+                self._count = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+            else:
+                self._count += 1
+            if self._count <= self.max_entries:
+                return
+            # Passou do limite pela contagem local: confere e despeja um lote
+            self._flush_touched(connection)
+            self._count = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries + self.evict_batch
+                connection.execute("""DELETE FROM solutions WHERE fingerprint IN (
+                                          SELECT fingerprint FROM solutions
+                                          ORDER BY last_used LIMIT ?)""", (excess,))
+                self._count -= excess
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            if self._pid == os.getpid():
+                with self._connection as connection:
+                    self._flush_touched(connection)
+            self._connection.close()
+            self._connection = None
+
+
+def solve_cached(game, cache, strategy='row-major'):
+    """
+    Resolve consultando o cache antes: num acerto a grade do solver recebe a
+    solução já na orientação do tabuleiro, sem busca. Retorna (status, acerto).
+    """
+    spec = game.export_puzzle()
+    key, index = fingerprint(game.size, spec['region_map'], spec['constraints'])
+    row = cache.get(key)
+    if row is not None:
+        status, solution = row
+        if solution is not None:
+            game.grid = from_canonical(game.size, solution, index)
+            game.sync_state()
+        return status, True
+
+    status = 'solved' if game.solve(strategy=strategy) else 'unsolvable'
+    solution = to_canonical(game.size, game.grid, index) if status == 'solved' else None
+    cache.put(key, game.size, status, solution)
+    return status, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve tabuleiros usando o cache de soluções")
+    parser.add_argument('--cache', default='heyawake-cache.sqlite')
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--seeds', type=int, default=20, help="sementes 0..N-1")
+    parser.add_argument('--max-entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    cache = SolutionCache(args.cache, args.max_entries)
+    start_time = time.perf_counter()
+    for seed in range(args.seeds):
+        game = create_solver(args.size, rng=random.Random(seed))
+        game.set_progress(None)
+        status, hit = solve_cached(game, cache)
+        print(f"semente {seed}: {status}{' (cache)' if hit else ''}")
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.seeds} tabuleiros em {elapsed:.3f}s - acertos: {cache.hits}, "
+          f"falhas: {cache.misses}, entradas: {len(cache)}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
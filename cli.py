@@ -0,0 +1,174 @@
+import argparse
+import json
+import sys
+
+from batch import solution_problem, solve_spec, solver_from_spec, spec_problem
+from cache import SolutionCache
+from generator import PuzzleGenerator, puzzle_to_json
+from unique import UniquePuzzleGenerator
+
+# Interface de linha de comando não interativa:
+#   generate - gera tabuleiros
+#   solve    - resolve tabuleiros lidos da entrada
+#   validate - confere soluções lidas da entrada
+# A entrada é um documento JSON (objeto ou lista) ou NDJSON (um objeto por
+# linha, processado à medida que chega); a saída é NDJSON ou, com
+# --format json, uma única lista JSON.
+
+
+def read_records(stream):
+    """Produz os objetos da entrada, detectando JSON único ou NDJSON pela primeira linha"""
+    first = ''
+    for line in stream:
+        if line.strip():
+            first = line
+            break
+    if not first:
+        return
+
+    try:
+        value = json.loads(first)
+    except json.JSONDecodeError:
+        value = json.loads(first + stream.read())
+        yield from value if isinstance(value, list) else [value]
+        return
+
+    yield from value if isinstance(value, list) else [value]
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RecordWriter:
+    """Escreve resultados como NDJSON (na hora) ou como uma lista JSON no fim"""
+
+    def __init__(self, stream, fmt='ndjson'):
+        self.stream = stream
+        self.fmt = fmt
+        self.records = []
+
+    def write(self, record):
+        if self.fmt == 'json':
+            self.records.append(record)
+        else:
+            self.stream.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self.stream.flush()
+
+    def close(self):
+        if self.fmt == 'json':
+            json.dump(self.records, self.stream, indent=2)
+            self.stream.write('\n')
+
+
+def open_input(path):
+    return sys.stdin if path in (None, '-') else open(path)
+
+
+def open_output(path):
+    return sys.stdout if path in (None, '-') else open(path, 'w')
+
+
+def progress_to_stderr(index):
+    """Callback de progresso que escreve eventos NDJSON em stderr"""
+    def report(solver):
+        event = {'index': index, 'attempts': solver.attempts, 'backtracks': solver.backtracks}
+        print(json.dumps(event), file=sys.stderr, flush=True)
+    return report
+
+
+def cmd_generate(args):
+    if args.unique:
+        generator = UniquePuzzleGenerator(args.seed, counter=args.counter)
+    else:
+        generator = PuzzleGenerator(args.seed)
+
+    writer = RecordWriter(open_output(args.output), args.format)
+    for size, region_map, constraints in generator.iter_puzzles(args.size, args.count):
+        writer.write(json.loads(puzzle_to_json(size, region_map, constraints)))
+    writer.close()
+    return 0
+
+
+def cmd_solve(args):
+    interval = None if args.quiet else args.progress_interval
+    cache = SolutionCache(args.cache) if args.cache else None
+    writer = RecordWriter(open_output(args.output), args.format)
+    failures = 0
+    for index, spec in enumerate(read_records(open_input(args.input))):
+        problem = spec_problem(spec)
+        if problem is not None:
+            result = {'index': index, 'spec': spec, 'status': 'error', 'error': problem}
+        else:
+            result = solve_spec(index, spec, args.timeout, args.strategy, args.backend,
+                                interval, progress_to_stderr(index), cache, args.node_limit)
+        failures += result['status'] != 'solved'
+        writer.write(result)
+    writer.close()
+    return 1 if failures else 0
+
+
+def cmd_validate(args):
+    writer = RecordWriter(open_output(args.output), args.format)
+    failures = 0
+    for index, record in enumerate(read_records(open_input(args.input))):
+        spec = record.get('spec', record) if isinstance(record, dict) else record
+        problem = spec_problem(spec)
+        if problem is None:
+            solution = record.get('solution') or record.get('grid')
+            game = solver_from_spec(spec)
+            problem = solution_problem(solution, game.size)
+        if problem is not None:
+            valid, message = False, problem
+        else:
+            game.grid = [list(row) for row in solution]
+            valid, message = game.validate_solution()
+        failures += not valid
+        writer.write({'index': index, 'valid': valid, 'message': message})
+    writer.close()
+    return 1 if failures else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Heyawake: gerar, resolver e validar tabuleiros")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_io(command, with_input=True):
+        if with_input:
+            command.add_argument('--input', '-i', default='-', help="JSON ou NDJSON ('-' = stdin)")
+        command.add_argument('--output', '-o', default='-', help="destino ('-' = stdout)")
+        command.add_argument('--format', choices=['ndjson', 'json'], default='ndjson')
+
+    generate = commands.add_parser('generate', help="gera tabuleiros")
+    generate.add_argument('--size', type=int, default=8)
+    generate.add_argument('--count', type=int, default=1)
+    generate.add_argument('--seed', type=int)
+    generate.add_argument('--unique', action='store_true', help="só tabuleiros com solução única")
+    generate.add_argument('--counter', choices=['search', 'dp'], default='search')
+    add_io(generate, with_input=False)
+    generate.set_defaults(run=cmd_generate)
+
+    solve = commands.add_parser('solve', help="resolve tabuleiros")
+    solve.add_argument('--strategy', default='row-major')
+    solve.add_argument('--backend', default='list')
+    solve.add_argument('--timeout', type=float, help="segundos por puzzle")
+    solve.add_argument('--node-limit', type=int, help="tentativas por puzzle")
+    solve.add_argument('--progress-interval', type=int, default=50000,
+                       help="tentativas entre eventos de progresso (em stderr)")
+    solve.add_argument('--quiet', '-q', action='store_true', help="sem progresso")
+    solve.add_argument('--cache', help="arquivo SQLite do cache de soluções")
+    add_io(solve)
+    solve.set_defaults(run=cmd_solve)
+
+    validate = commands.add_parser('validate', help="valida soluções")
+    add_io(validate)
+    validate.set_defaults(run=cmd_validate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+from array import array
+
+from generator import new_region_map
+from novo import RULE_FAILURES, VALID_SOLUTION, HeyawakeSolver, SearchLimitReached, draw_board
+
+# Estado compacto de um tabuleiro para manter milhares de instâncias vivas:
+# nada de listas aninhadas nem dicionários por região, só buffers planos
+# indexados por r * size + c. Vizinhos e bordas são calculados na hora em vez
+# de ficarem guardados num BoardIndex. solve() busca direto nesses buffers
+# (linha a linha, sem propagação); to_solver() monta o HeyawakeSolver
+# completo quando se quer propagação, estratégias ou tabela de transposição.
+
+WHITE = 1
+BLACK = 2
+
+
+class CompactBoard:
+    """
+    cells          - bytearray com 0/1/2 por célula
+    region_of      - região de cada célula (bytearray, ou array('H'))
+    constraints    - array('b') com o número de cada região (-1 = sem número)
+    region_offsets - as células da região k são region_cells[offsets[k]:offsets[k + 1]]
+    region_cells   - posições de todas as regiões num único array('H')
+    blacks/unknown - pretas e vazias de cada região, mantidas por set_cell/clear_cell
+    """
+
+    __slots__ = ('size', 'cells', 'region_of', 'constraints', 'region_offsets',
+                 'region_cells', 'blacks', 'unknown')
+
+    def __init__(self, size, region_map, constraints):
+        self.size = size
+        total = size * size
+        flat = isinstance(region_map[0], (list, tuple))
+        self.region_of = new_region_map(size)
+        for pos in range(total):
+            self.region_of[pos] = region_map[pos // size][pos % size] if flat else region_map[pos]
+        self.constraints = array('b', constraints)
+        self.cells = bytearray(total)
+
+        # Ordenação por contagem: posições agrupadas por região
+        regions = len(self.constraints)
+        counts = array('H', bytes(2 * (regions + 1)))
+        for region_id in self.region_of:
+            counts[region_id + 1] += 1
+        for region_id in range(regions):
+            counts[region_id + 1] += counts[region_id]
+        if any(counts[k] == counts[k + 1] for k in range(regions)):
+            raise ValueError("Toda região precisa de pelo menos uma célula")
+        self.region_offsets = counts
+        self.region_cells = array('H', bytes(2 * total))
+        filled = array('H', counts[:regions])
+        for pos, region_id in enumerate(self.region_of):
+            self.region_cells[filled[region_id]] = pos
+            filled[region_id] += 1
+
+        self.blacks = array('H', bytes(2 * regions))
+        self.unknown = array('H', (counts[k + 1] - counts[k] for k in range(regions)))
+
+    @classmethod
+    def from_solver(cls, game):
+        """Cópia compacta do tabuleiro e da grade de um HeyawakeSolver"""
+        board = cls(game.size, game.region_map, [region['constraint'] for region in game.regions])
+        board.load_grid(game.grid)
+        return board
+
+    @classmethod
+    def from_record(cls, view):
+        """Tabuleiro (e solução, se houver) de um registro do corpus"""
+        board = cls(view.size, view.region_map, view.constraints)
+        solution = view.solution
+        if solution is not None:
+            board.load_grid(solution)
+        return board
+
+    def to_solver(self, backend_class=HeyawakeSolver):
+        """HeyawakeSolver completo (com índice e estruturas de busca) para este tabuleiro"""
+        game = backend_class(self.size, region_map=self.region_of, constraints=self.constraints)
+        game.grid = self.grid
+        game.sync_state()
+        return game
+
+    @property
+    def grid(self):
+        """Grade em linhas (cópia), no formato de HeyawakeSolver.grid"""
+        size = self.size
+        return [list(self.cells[i * size:(i + 1) * size]) for i in range(size)]
+
+    def load_grid(self, grid):
+        """Substitui a grade e recalcula os contadores das regiões"""
+        size = self.size
+        for i in range(size):
+            self.cells[i * size:(i + 1) * size] = bytes(grid[i])
+        self.sync_state()
+
+    def sync_state(self):
+        cells = self.cells
+        offsets = self.region_offsets
+        region_cells = self.region_cells
+        for region_id in range(len(self.constraints)):
+            blacks = unknown = 0
+            for k in range(offsets[region_id], offsets[region_id + 1]):
+                value = cells[region_cells[k]]
+                blacks += value == BLACK
+                unknown += value == 0
+            self.blacks[region_id] = blacks
+            self.unknown[region_id] = unknown
+
+    def set_cell(self, pos, value):
+        """Atribui uma célula vazia mantendo os contadores em dia"""
+        region_id = self.region_of[pos]
+        self.cells[pos] = value
+        self.unknown[region_id] -= 1
+        if value == BLACK:
+            self.blacks[region_id] += 1
+
+    def clear_cell(self, pos):
+        region_id = self.region_of[pos]
+        if self.cells[pos] == BLACK:
+            self.blacks[region_id] -= 1
+        self.unknown[region_id] += 1
+        self.cells[pos] = 0
+
+    def neighbours(self, pos):
+        """Vizinhos ortogonais de pos (calculados, não guardados)"""
+        size = self.size
+        row, col = divmod(pos, size)
+        if row:
+            yield pos - size
+        if col < size - 1:
+            yield pos + 1
+        if row < size - 1:
+            yield pos + size
+        if col:
+            yield pos - 1
+
+    def check_no_adjacent_blacks(self):
+        """REGRA 1: nenhuma preta com vizinha preta à direita ou abaixo"""
+        cells = self.cells
+        size = self.size
+        for pos, value in enumerate(cells):
+            if value == BLACK:
+                if pos % size < size - 1 and cells[pos + 1] == BLACK:
+                    return False
+                if pos + size < len(cells) and cells[pos + size] == BLACK:
+                    return False
+        return True
+
+    def check_white_connectivity(self):
+        """REGRA 2: há brancas e todas formam uma única componente"""
+        cells = self.cells
+        if WHITE not in cells:
+            return False
+        start = cells.index(WHITE)
+        seen = bytearray(len(cells))
+        seen[start] = 1
+        stack = [start]
+        reached = 1
+        while stack:
+            pos = stack.pop()
+            for other in self.neighbours(pos):
+                if not seen[other] and cells[other] == WHITE:
+                    seen[other] = 1
+                    reached += 1
+                    stack.append(other)
+        return reached == cells.count(WHITE)
+
+    def check_region_constraint(self, region_id):
+        """REGRA 3 parcial: a contagem ainda pode chegar exatamente ao número"""
+        constraint = self.constraints[region_id]
+        if constraint < 0:
+            return True
+        blacks = self.blacks[region_id]
+        return blacks <= constraint <= blacks + self.unknown[region_id]
+
+    def check_final_constraints(self):
+        """REGRA 3: regiões numeradas com exatamente N pretas"""
+        return all(constraint < 0 or self.blacks[region_id] == constraint
+                   for region_id, constraint in enumerate(self.constraints))
+
+    def check_white_line_regions(self):
+        """REGRA 4: nenhuma sequência branca de linha ou coluna passa por 3+ regiões"""
+        size = self.size
+        cells = self.cells
+        region_of = self.region_of
+        for start, step in [(i * size, 1) for i in range(size)] + [(j, size) for j in range(size)]:
+            first = second = -1
+            for pos in range(start, start + step * size, step):
+                if cells[pos] != WHITE:
+                    first = second = -1
+                    continue
+                region_id = region_of[pos]
+                if first < 0:
+                    first = region_id
+                elif region_id != first and second < 0:
+                    second = region_id
+                elif region_id != first and region_id != second:
+                    return False
+        return True
+
+    def region_can_exit(self, region_id):
+        """REGRA 5 para uma região: a primeira branca alcança alguma célula de fora?"""
+        cells = self.cells
+        region_of = self.region_of
+        members = self.region_cells[self.region_offsets[region_id]:self.region_offsets[region_id + 1]]
+        start = next((pos for pos in members if cells[pos] == WHITE), None)
+        if start is None:
+            return True
+        visited = {start}
+        stack = [start]
+        while stack:
+            pos = stack.pop()
+            for other in self.neighbours(pos):
+                if cells[other] == BLACK or other in visited:
+                    continue
+                if region_of[other] != region_id:
+                    return True
+                visited.add(other)
+                stack.append(other)
+        return False
+
+    def check_white_region_isolation(self):
+        """REGRA 5: nenhuma região com brancas presas só dentro dela"""
+        return all(self.region_can_exit(region_id) for region_id in range(len(self.constraints)))
+
+    def check_non_black_connectivity(self):
+        """REGRA 2 parcial: brancas e vazias formam uma única componente"""
+        cells = self.cells
+        start = next((pos for pos, value in enumerate(cells) if value != BLACK), None)
+        if start is None:
+            return False
+        seen = bytearray(len(cells))
+        seen[start] = 1
+        stack = [start]
+        reached = 1
+        while stack:
+            pos = stack.pop()
+            for other in self.neighbours(pos):
+                if not seen[other] and cells[other] != BLACK:
+                    seen[other] = 1
+                    reached += 1
+                    stack.append(other)
+        return reached == len(cells) - cells.count(BLACK)
+
+    def white_run_ok(self, pos):
+        """REGRA 4 parcial: as sequências brancas (linha e coluna) que passam por pos"""
+        size = self.size
+        cells = self.cells
+        region_of = self.region_of
+        row_start = pos - pos % size
+        for step, low, high in ((1, row_start, row_start + size - 1), (size, pos % size, len(cells) - 1)):
+            first = last = pos
+            while first - step >= low and cells[first - step] == WHITE:
+                first -= step
+            while last + step <= high and cells[last + step] == WHITE:
+                last += step
+            if len({region_of[p] for p in range(first, last + 1, step)}) > 2:
+                return False
+        return True
+
+    def try_assign(self, pos, value):
+        """Atribui uma célula vazia se as verificações parciais aceitarem"""
+        cells = self.cells
+        if value == BLACK and any(cells[other] == BLACK for other in self.neighbours(pos)):
+            return False
+        self.set_cell(pos, value)
+        region_id = self.region_of[pos]
+        if (self.check_region_constraint(region_id) and
+                (self.check_non_black_connectivity() if value == BLACK else self.white_run_ok(pos)) and
+                all(self.region_can_exit(other) for other in
+                    {region_id, *(self.region_of[q] for q in self.neighbours(pos))})):
+            return True
+        self.clear_cell(pos)
+        return False
+
+    def solve(self, node_limit=None):
+        """
+        Busca linha a linha direto nos buffers, a partir da grade vazia: o
+        estado da busca é só cells e os contadores das regiões (a posição
+        corrente diz tudo o que falta desfazer). True deixa a solução em
+        cells; node_limit levanta SearchLimitReached como em HeyawakeSolver.
+        """
+        cells = self.cells
+        total = len(cells)
+        cells[:] = bytes(total)
+        self.sync_state()
+        attempts = 0
+        pos = 0
+        value = WHITE
+        while pos >= 0:
+            if pos == total and self.validate_solution()[0]:
+                return True
+            if pos == total or value > BLACK:
+                # Volta: a célula anterior passa para o próximo valor
+                pos -= 1
+                if pos >= 0:
+                    value = cells[pos] + 1
+                    self.clear_cell(pos)
+                continue
+            attempts += 1
+            if node_limit is not None and attempts > node_limit:
+                raise SearchLimitReached(attempts, 'nodes')
+            if self.try_assign(pos, value):
+                pos += 1
+                value = WHITE
+            else:
+                value += 1
+        return False
+
+    def validate_solution(self):
+        """Validação completa, com as mesmas mensagens de HeyawakeSolver.validate_solution"""
+        self.sync_state()
+        checks = [self.check_no_adjacent_blacks, self.check_white_connectivity,
+                  self.check_final_constraints, self.check_white_line_regions,
+                  self.check_white_region_isolation]
+        for check, message in zip(checks, RULE_FAILURES):
+            if not check():
+                return False, message
+        return True, VALID_SOLUTION
+
+    def get_border_chars(self, i, j):
+        """Bordas da célula (cima, baixo, esquerda, direita), calculadas pelo mapa"""
+        size = self.size
+        region_of = self.region_of
+        pos = i * size + j
+        region_id = region_of[pos]
+        return (i == 0 or region_of[pos - size] != region_id,
+                i == size - 1 or region_of[pos + size] != region_id,
+                j == 0 or region_of[pos - 1] != region_id,
+                j == size - 1 or region_of[pos + 1] != region_id)
+
+    def cell_text(self, i, j):
+        pos = i * self.size + j
+        value = self.cells[pos]
+        if value == WHITE:
+            return " ○ "
+        if value == BLACK:
+            return " ■ "
+        region_id = self.region_of[pos]
+        constraint = self.constraints[region_id]
+        if constraint >= 0 and self.region_cells[self.region_offsets[region_id]] == pos:
+            return f" {constraint} "
+        return "   "
+
+    def display(self, title="HEYAWAKE"):
+        draw_board(self.size, self.get_border_chars, self.cell_text, title)
+
+    def nbytes(self):
+        """Bytes ocupados pelo objeto e seus buffers"""
+        total = object.__sizeof__(self)
+        for name in self.__slots__[1:]:
+            total += getattr(self, name).__sizeof__()
+        return total
@@ -0,0 +1,315 @@
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+
+from novo import HeyawakeSolver, create_solver
+
+# Corpus binário de tabuleiros em registros de tamanho fixo, lido por mmap
+# sem cópia. Todos os tabuleiros de um arquivo têm o mesmo tamanho.
+#
+# Cabeçalho do arquivo (16 bytes, little-endian):
+#   magic 'HEYW', versão, size, bytes por célula do mapa (1 ou 2),
+#   tamanho do registro, número máximo de regiões (= size * size)
+# Registro:
+#   status (1 byte) + 1 byte livre + número de regiões (2 bytes)
+#   mapa de regiões - size * size células de 1 ou 2 bytes, linha a linha
+#   números         - um byte com sinal por região possível (-1 = sem número)
+#   solução         - 2 bits por célula (0 vazio, 1 branco, 2 preto), 4 por byte
+#
+# O número de registros vem do tamanho do arquivo, então acrescentar não
+# mexe no cabeçalho: vários processos podem acrescentar ao mesmo arquivo,
+# um lote por vez sob flock.
+
+MAGIC = b'HEYW'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBxII')
+RECORD_HEADER = struct.Struct('<BxH')
+
+# Status do registro ↔ status de resultado de batch.solve_spec
+STATUSES = [None, 'solved', 'unsolvable', 'timeout']
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class CorpusLayout:
+    """Deslocamentos de cada campo dentro de um registro para um tamanho de tabuleiro"""
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.cell_width = 1 if self.cells <= 256 else 2
+        self.max_regions = self.cells
+        self.map_offset = RECORD_HEADER.size
+        self.constraints_offset = self.map_offset + self.cells * self.cell_width
+        self.solution_offset = self.constraints_offset + self.max_regions
+        self.record_size = self.solution_offset + (self.cells + 3) // 4
+
+    def header(self):
+        return HEADER.pack(MAGIC, VERSION, self.size, self.cell_width, self.record_size,
+                           self.max_regions)
+
+    @classmethod
+    def from_header(cls, data):
+        magic, version, size, cell_width, record_size, max_regions = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Arquivo não é um corpus Heyawake (versão 1)")
+        layout = cls(size)
+        if (cell_width, record_size, max_regions) != (layout.cell_width, layout.record_size,
+                                                      layout.max_regions):
+            raise ValueError("Cabeçalho do corpus inconsistente")
+        return layout
+
+    def pack(self, region_map, constraints, status=None, solution=None):
+        """Bytes de um registro; region_map em linhas ou plano, solution em linhas ou None"""
+        if isinstance(region_map[0], (list, tuple)):
+            region_map = [region_id for row in region_map for region_id in row]
+        if len(region_map) != self.cells:
+            raise ValueError(f"Mapa de regiões com {len(region_map)} células, esperado {self.cells}")
+
+        record = bytearray(self.record_size)
+        RECORD_HEADER.pack_into(record, 0, STATUS_CODES[status], len(constraints))
+        record[self.map_offset:self.constraints_offset] = b''.join(
+            region_id.to_bytes(self.cell_width, 'little') for region_id in region_map)
+        numbers = bytes(constraint & 0xFF for constraint in constraints)
+        record[self.constraints_offset:self.solution_offset] = (
+            numbers + b'\xff' * (self.max_regions - len(numbers)))
+        if solution is not None:
+            for pos in range(self.cells):
+                value = solution[pos // self.size][pos % self.size]
+                record[self.solution_offset + pos // 4] |= value << (2 * (pos % 4))
+        return bytes(record)
+
+
+class RecordView:
+    """
+    Um registro do corpus como fatias de memoryview sobre o mmap (sem cópia).
+    Os campos são decodificados só quando lidos.
+    """
+
+    __slots__ = ('layout', 'data')
+
+    def __init__(self, layout, data):
+        self.layout = layout
+        self.data = data
+
+    @property
+    def size(self):
+        return self.layout.size
+
+    @property
+    def status(self):
+        return STATUSES[self.data[0]]
+
+    @property
+    def region_count(self):
+        return RECORD_HEADER.unpack_from(self.data)[1]
+
+    @property
+    def region_map(self):
+        """
+        Mapa plano de regiões indexado por r * size + c: memoryview sem cópia,
+        exceto células de 2 bytes num host big-endian (array('H') convertido)
+        """
+        layout = self.layout
+        cells = self.data[layout.map_offset:layout.constraints_offset]
+        if layout.cell_width == 1:
+            return cells
+        if sys.byteorder == 'little':
+            return cells.cast('H')
+        # O arquivo é sempre little-endian (CorpusLayout.pack)
+        values = array('H')
+        values.frombytes(cells)
+        values.byteswap()
+        return values
+
+    @property
+    def constraints(self):
+        """Números das regiões (memoryview de bytes com sinal, -1 = sem número)"""
+        start = self.layout.constraints_offset
+        return self.data[start:start + self.region_count].cast('b')
+
+    def cell(self, pos):
+        """Valor da célula pos na solução gravada"""
+        byte = self.data[self.layout.solution_offset + pos // 4]
+        return (byte >> (2 * (pos % 4))) & 3
+
+    @property
+    def solution(self):
+        """Solução em linhas, ou None se o registro não estiver resolvido"""
+        if self.status != 'solved':
+            return None
+        size = self.size
+        return [[self.cell(i * size + j) for j in range(size)] for i in range(size)]
+
+    def to_spec(self):
+        return {'size': self.size, 'region_map': list(self.region_map),
+                'constraints': list(self.constraints)}
+
+
+class Corpus:
+    """
+    Leitura de um corpus por mmap com acesso aleatório por índice:
+
+        with Corpus('tabuleiros.heyw') as corpus:
+            game = HeyawakeSolver.from_record(corpus[123])
+
+    Registros acrescentados depois da abertura aparecem após refresh().
+    Views ainda vivas seguram o mapeamento antigo, que só é desfeito quando
+    a última delas for descartada.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.layout = CorpusLayout.from_header(self._file.read(HEADER.size))
+        self._map = None
+        self._view = None
+        self.count = 0
+        self.refresh()
+
+    def refresh(self):
+        """Remapeia o arquivo para enxergar registros acrescentados por outros processos"""
+        self._release()
+        length = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), length, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        # Um registro incompleto no fim (escrita interrompida) é ignorado
+        self.count = (length - HEADER.size) // self.layout.record_size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Índice fora do corpus")
+        start = HEADER.size + index * self.layout.record_size
+        return RecordView(self.layout, self._view[start:start + self.layout.record_size])
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def _release(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
+            self._map = None
+
+    def close(self):
+        self._release()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def append_records(path, size, records):
+    """
+    Acrescenta registros (bytes de CorpusLayout.pack) ao corpus, criando o
+    arquivo se preciso. O lote inteiro é escrito sob flock exclusivo, então
+    workers em paralelo nunca intercalam registros. Só em POSIX (fcntl).
+    """
+    import fcntl
+
+    layout = CorpusLayout(size)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        length = os.fstat(fd).st_size
+        if length == 0:
+            os.write(fd, layout.header())
+        else:
+            if CorpusLayout.from_header(os.pread(fd, HEADER.size, 0)).size != size:
+                raise ValueError("O corpus guarda tabuleiros de outro tamanho")
+            # Descarta um registro incompleto deixado por uma escrita interrompida
+            tail = (length - HEADER.size) % layout.record_size
+            if tail:
+                os.ftruncate(fd, length - tail)
+        os.write(fd, b''.join(records))
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def append_solver(path, game, status=None):
+    """Acrescenta o tabuleiro de um solver (e a grade, se status for 'solved')"""
+    layout = CorpusLayout(game.size)
+    spec = game.export_puzzle()
+    solution = game.grid if status == 'solved' else None
+    append_records(path, game.size, [layout.pack(spec['region_map'], spec['constraints'],
+                                                 status, solution)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus binário de tabuleiros Heyawake")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="gera (e resolve) tabuleiros e grava o corpus")
+    build.add_argument('path')
+    build.add_argument('--size', type=int, default=8)
+    build.add_argument('--count', type=int, default=100)
+    build.add_argument('--seed-start', type=int, default=0)
+    build.add_argument('--solve', action='store_true', help="grava também as soluções")
+
+    show = commands.add_parser('show', help="mostra um registro")
+    show.add_argument('path')
+    show.add_argument('index', type=int)
+
+    scan = commands.add_parser('scan', help="valida todas as soluções gravadas")
+    scan.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        layout = CorpusLayout(args.size)
+        records = []
+        for seed in range(args.seed_start, args.seed_start + args.count):
+            game = create_solver(args.size, rng=random.Random(seed))
+            status = solution = None
+            if args.solve:
+                game.set_progress(None)
+                status = 'solved' if game.solve() else 'unsolvable'
+                solution = game.grid if status == 'solved' else None
+            spec = game.export_puzzle()
+            records.append(layout.pack(spec['region_map'], spec['constraints'], status, solution))
+        append_records(args.path, args.size, records)
+        print(f"{len(records)} registros de {layout.record_size} bytes gravados em {args.path}")
+
+    elif args.command == 'show':
+        with Corpus(args.path) as corpus:
+            view = corpus[args.index]
+            game = HeyawakeSolver.from_record(view)
+            game.display(f"REGISTRO {args.index} ({view.status or 'sem solução'})")
+
+    else:
+        with Corpus(args.path) as corpus:
+            start_time = time.perf_counter()
+            counts = {'valid': 0, 'invalid': 0, 'unsolved': 0}
+            for view in corpus:
+                if view.status != 'solved':
+                    counts['unsolved'] += 1
+                    continue
+                game = HeyawakeSolver.from_record(view)
+                counts['valid' if game.validate_solution()[0] else 'invalid'] += 1
+            elapsed = time.perf_counter() - start_time
+        print(json.dumps(dict(counts, records=len(corpus), time=round(elapsed, 3))))
+        return 1 if counts['invalid'] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import argparse
+import json
+import random
+import sys
+from array import array
+
+# Gerador de tabuleiros independente do solver. Cada tabuleiro é uma tupla
+# compacta (size, region_map, constraints):
+#   region_map  - mapa plano de regiões indexado por r * size + c
+#                 (bytearray, ou array('H') se houver mais de 256 regiões possíveis)
+#   constraints - array('b') com o número de cada região (-1 = sem número)
+
+
+def new_region_map(size):
+    """Mapa plano de regiões zerado, no menor tipo que comporta size * size regiões"""
+    if size * size <= 256:
+        return bytearray(size * size)
+    return array('H', bytes(2 * size * size))
+
+
+class PuzzleGenerator:
+    """
+    Gera regiões retangulares (até 4x4) cobrindo todo o tabuleiro com
+    constraints balanceadas. Usa apenas o gerador aleatório recebido, na
+    mesma sequência de sorteios do gerador original: a mesma semente produz
+    sempre o mesmo tabuleiro.
+    """
+
+    def __init__(self, seed=None, rng=None):
+        self.rng = rng if rng is not None else random.Random(seed)
+        self._used = bytearray()
+
+    def generate(self, size):
+        rng = self.rng
+        total = size * size
+        if len(self._used) != total:
+            self._used = bytearray(total)
+        else:
+            self._used[:] = bytes(total)
+        used = self._used
+        region_map = new_region_map(size)
+        constraints = array('b')
+
+        # Tabuleiros maiores = mais constraints
+        # 4x4 → ~35%, 6x6 → ~47%, 8x8 → ~58%, 10x10+ → ~70% das regiões
+        size_factor = (size - 4) / 6
+        probability = min(0.75, 0.35 + (0.35 * size_factor))
+
+        region_id = 0
+        for i in range(size):
+            for j in range(size):
+                if used[i * size + j]:
+                    continue
+
+                width = rng.randint(1, min(4, size - j))
+                height = rng.randint(1, min(4, size - i))
+
+                # Encolhe o retângulo até caber nas células livres
+                actual_width = 0
+                for w in range(width):
+                    if used[i * size + j + w]:
+                        break
+                    actual_width = w + 1
+
+                actual_height = 0
+                for h in range(height):
+                    start = (i + h) * size + j
+                    if any(used[start:start + actual_width]):
+                        break
+                    actual_height = h + 1
+
+                for r in range(i, i + actual_height):
+                    for c in range(j, j + actual_width):
+                        used[r * size + c] = 1
+                        region_map[r * size + c] = region_id
+
+                region_size = actual_width * actual_height
+                constraint = -1
+                if region_size > 1 and rng.random() < probability:
+                    # Regiões maiores podem ter mais pretos
+                    if region_size <= 2:
+                        max_blacks = 1
+                    elif region_size <= 4:
+                        max_blacks = min(2, region_size // 2)
+                    elif region_size <= 6:
+                        max_blacks = min(3, region_size // 2)
+                    else:
+                        max_blacks = min(4, region_size // 2)
+                    constraint = rng.randint(0, max_blacks)
+
+                constraints.append(constraint)
+                region_id += 1
+
+        return size, region_map, constraints
+
+    def iter_puzzles(self, size, count):
+        """Produz count tabuleiros, um de cada vez"""
+        for _ in range(count):
+            yield self.generate(size)
+
+
+def puzzle_to_json(size, region_map, constraints):
+    """Uma linha NDJSON, aceita como especificação pelo solver em lote"""
+    return json.dumps({'size': size, 'region_map': list(region_map),
+                       'constraints': list(constraints)}, separators=(',', ':'))
+
+
+def write_puzzles(stream, size, count, seed=None):
+    """Grava count tabuleiros em NDJSON sem mantê-los em memória"""
+    generator = PuzzleGenerator(seed)
+    for puzzle in generator.iter_puzzles(size, count):
+        stream.write(puzzle_to_json(*puzzle))
+        stream.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera tabuleiros Heyawake em massa")
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help="arquivo NDJSON ('-' = stdout)")
+    args = parser.parse_args()
+
+    if args.output == '-':
+        write_puzzles(sys.stdout, args.size, args.count, args.seed)
+    else:
+        with open(args.output, 'w') as f:
+            write_puzzles(f, args.size, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import random
+import time
+from functools import wraps
+
+from novo import create_solver
+
+# Instrumentação opcional do solver. Os métodos medidos são embrulhados só
+# na instância (atributos que escondem os métodos da classe) e removidos no
+# detach(): com o profiler desligado a classe não muda e a busca não paga
+# nada.
+
+# Método → regra (ou etapa da busca) que ele implementa
+TRACKED_METHODS = {
+    'is_valid_placement': 'REGRA 1',
+    'check_white_connectivity_partial': 'REGRA 2',
+    'check_region_constraint': 'REGRA 3',
+    'check_white_line_regions_partial': 'REGRA 4',
+    'check_region_isolation_at': 'REGRA 5',
+    'check_white_region_isolation': 'REGRA 5',
+    'try_assign': 'atribuição',
+    'propagate': 'propagação',
+    'forced_value': 'propagação',
+    'select_cell': 'ramificação',
+    'is_solved': 'verificação final',
+    'undo': 'retrocesso',
+}
+
+
+class SolverProfiler:
+    """
+    Conta chamadas, tempo acumulado e rejeições (retorno False) de cada
+    método medido, o histograma de profundidade dos nós e uma amostra dos
+    eventos de poda (uma a cada sample_every rejeições, até max_events).
+
+        with SolverProfiler(game) as profiler:
+            game.solve()
+        profiler.to_json('perfil.json')
+        profiler.to_folded('perfil.folded')   # flamegraph.pl / speedscope
+    """
+
+    def __init__(self, game, methods=None, sample_every=100, max_events=10000):
+        self.game = game
+        self.methods = list(methods or TRACKED_METHODS)
+        self.sample_every = sample_every
+        self.max_events = max_events
+        self.stats = {name: {'calls': 0, 'time': 0.0, 'rejections': 0} for name in self.methods}
+        self.depths = {}
+        self.events = []
+        self.rejections = 0
+        self.folded = {}
+        self.stack = []
+        self.child_time = [0.0]
+        self.wall_time = 0.0
+        self._start = None
+
+    def attach(self):
+        for name in self.methods:
+            setattr(self.game, name, self._wrap(name, getattr(self.game, name)))
+        self._start = time.perf_counter()
+        return self
+
+    def detach(self):
+        if self._start is not None:
+            self.wall_time += time.perf_counter() - self._start
+            self._start = None
+        for name in self.methods:
+            self.game.__dict__.pop(name, None)
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    def _wrap(self, name, method):
+        stats = self.stats[name]
+        stack = self.stack
+        child_time = self.child_time
+        folded = self.folded
+        game = self.game
+        node_entry = name == ('propagate' if game.propagation else 'select_cell')
+
+        @wraps(method)
+        def wrapper(*args):
+            if node_entry:
+                depth = len(game.path)
+                self.depths[depth] = self.depths.get(depth, 0) + 1
+
+            stack.append(name)
+            child_time.append(0.0)
+            start = time.perf_counter()
+            result = method(*args)
+            elapsed = time.perf_counter() - start
+            children = child_time.pop()
+            key = ';'.join(stack)
+            stack.pop()
+            folded[key] = folded.get(key, 0.0) + elapsed - children
+            child_time[-1] += elapsed
+
+            stats['calls'] += 1
+            stats['time'] += elapsed
+            if result is False:
+                stats['rejections'] += 1
+                self._sample(name, args)
+            return result
+        return wrapper
+
+    def _sample(self, name, args):
+        self.rejections += 1
+        if self.rejections % self.sample_every or len(self.events) >= self.max_events:
+            return
+        self.events.append({
+            'method': name,
+            'rule': TRACKED_METHODS.get(name, name),
+            'args': list(args),
+            'depth': len(self.game.path),
+            'attempts': self.game.attempts,
+        })
+
+    def to_dict(self):
+        rules = {}
+        for name, stats in self.stats.items():
+            rules[name] = dict(stats, rule=TRACKED_METHODS.get(name, name))
+        return {
+            'wall_time': self.wall_time,
+            'attempts': self.game.attempts,
+            'methods': rules,
+            'depth_histogram': {str(depth): count for depth, count in sorted(self.depths.items())},
+            'events': self.events,
+        }
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def folded_lines(self):
+        """Pilhas no formato "solve;a;b microssegundos" (tempo próprio de cada pilha)"""
+        tracked = self.child_time[0]
+        lines = [f"solve {int((self.wall_time - tracked) * 1e6)}"]
+        for key, seconds in sorted(self.folded.items()):
+            lines.append(f"solve;{key} {int(seconds * 1e6)}")
+        return lines
+
+    def to_folded(self, path):
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.folded_lines()) + '\n')
+
+    def summary(self):
+        lines = [f"{'Método':<34} {'Regra':<18} {'Chamadas':>10} {'Tempo (s)':>10} {'Rejeições':>10}"]
+        ranked = sorted(self.stats.items(), key=lambda item: item[1]['time'], reverse=True)
+        for name, stats in ranked:
+            lines.append(f"{name:<34} {TRACKED_METHODS.get(name, name):<18} {stats['calls']:>10,} "
+                         f"{stats['time']:>10.3f} {stats['rejections']:>10,}")
+        return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil por regra de uma resolução Heyawake")
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', default='row-major')
+    parser.add_argument('--backend', default='list')
+    parser.add_argument('--sample-every', type=int, default=100)
+    parser.add_argument('--json', help="grava o perfil em JSON")
+    parser.add_argument('--folded', help="grava pilhas no formato de flamegraph")
+    args = parser.parse_args()
+
+    game = create_solver(args.size, backend=args.backend, rng=random.Random(args.seed))
+    game.set_progress(None)
+    with SolverProfiler(game, sample_every=args.sample_every) as profiler:
+        solved = game.solve(strategy=args.strategy)
+
+    print(f"Resolvido: {solved} | Tentativas: {game.attempts:,} | Tempo: {profiler.wall_time:.3f}s")
+    print(profiler.summary())
+    if args.json:
+        profiler.to_json(args.json)
+    if args.folded:
+        profiler.to_folded(args.folded)
+
+
+if __name__ == "__main__":
+    main()
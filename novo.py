@@ -1,132 +1,428 @@
+import hashlib
 import random
 import time
-from collections import deque
+from collections import OrderedDict
+
+from generator import PuzzleGenerator
 
 # Constantes para a grade
 # 0: Vazio
 # 1: Branco (White - ○)
 # 2: Preto (Black - ■)
 
+# Mensagens de validate_solution: a primeira regra violada, em ordem
+RULE_FAILURES = (
+    "❌ REGRA 1: Células pretas adjacentes ortogonalmente!",
+    "❌ REGRA 2: Células brancas desconectadas!",
+    "❌ REGRA 3: Constraints numéricas violadas!",
+    "❌ REGRA 4: Linha branca contínua cruza 3+ regiões!",
+    "❌ REGRA 5: Brancos isolados dentro de uma região!",
+)
+VALID_SOLUTION = "✅ SOLUÇÃO VÁLIDA!"
+
+# Estratégias de ramificação: nome → método que escolhe a próxima célula
+BRANCHING_STRATEGIES = {
+    'row-major': 'select_row_major',
+    'mrv': 'select_most_constrained',
+    'slack': 'select_region_slack',
+    'degree': 'select_max_degree',
+}
+
+def line_windows(size, region_map):
+    """
+    Janelas mínimas (em posições lineares) onde uma linha branca cruzaria
+    3 regiões. Se todas as células de uma janela forem brancas, a REGRA 4
+    foi violada; e toda violação contém ao menos uma janela inteira.
+    """
+    windows = []
+    lines = [[i * size + j for j in range(size)] for i in range(size)]
+    lines += [[i * size + j for i in range(size)] for j in range(size)]
+    for line in lines:
+        # Divide a linha em faixas contíguas da mesma região
+        strips = []
+        for pos in line:
+            region_id = region_map[pos // size][pos % size]
+            if strips and strips[-1][0] == region_id:
+                strips[-1][1].append(pos)
+            else:
+                strips.append((region_id, [pos]))
+
+        for i in range(len(strips)):
+            seen = {strips[i][0]}
+            for k in range(i + 1, len(strips)):
+                seen.add(strips[k][0])
+                if len(seen) == 3:
+                    window = [strips[i][1][-1]]
+                    for _, cells in strips[i + 1:k]:
+                        window.extend(cells)
+                    window.append(strips[k][1][0])
+                    windows.append(window)
+                    break
+    return windows
+
+
+# Bits de borda de região de cada célula (BoardIndex.borders)
+BORDER_TOP = 1
+BORDER_BOTTOM = 2
+BORDER_LEFT = 4
+BORDER_RIGHT = 8
+
+
+class BoardIndex:
+    """
+    Geometria do tabuleiro calculada uma única vez: vizinhos ortogonais e
+    diagonais por célula, janelas da REGRA 4 e bordas das regiões.
+    Não depende da grade, então pode ser reaproveitado por quantos solves
+    (e solvers) do mesmo tabuleiro forem necessários.
+    """
+
+    def __init__(self, size, region_map, regions):
+        self.size = size
+        total = size * size
+
+        self.neighbours = []
+        self.diagonals = []
+        self.on_edge = bytearray(total)
+        self.borders = bytearray(total)
+        for pos in range(total):
+            row, col = divmod(pos, size)
+            self.neighbours.append(tuple(
+                (row + dr, col + dc) for dr, dc in [(-1,0), (0,1), (1,0), (0,-1)]
+                if 0 <= row + dr < size and 0 <= col + dc < size))
+            self.diagonals.append(tuple(
+                (row + dr) * size + col + dc for dr, dc in [(-1,-1), (-1,1), (1,-1), (1,1)]
+                if 0 <= row + dr < size and 0 <= col + dc < size))
+            self.on_edge[pos] = row == 0 or col == 0 or row == size - 1 or col == size - 1
+
+            region_id = region_map[row][col]
+            bits = 0
+            if row == 0 or region_map[row - 1][col] != region_id:
+                bits |= BORDER_TOP
+            if row == size - 1 or region_map[row + 1][col] != region_id:
+                bits |= BORDER_BOTTOM
+            if col == 0 or region_map[row][col - 1] != region_id:
+                bits |= BORDER_LEFT
+            if col == size - 1 or region_map[row][col + 1] != region_id:
+                bits |= BORDER_RIGHT
+            self.borders[pos] = bits
+
+        self.windows = line_windows(size, region_map)
+        self.window_cells = [[divmod(pos, size) for pos in window] for window in self.windows]
+        self.windows_by_cell = [[] for _ in range(total)]
+        for index, window in enumerate(self.windows):
+            for pos in window:
+                self.windows_by_cell[pos].append(index)
+
+        # Célula onde o número de cada região é desenhado
+        self.label_cells = {min(region['cells']): region['id'] for region in regions}
+
+        # Última posição de cada região numerada (-1 = sem número)
+        self.numbered_last = [max(r * size + c for r, c in region['cells'])
+                              if region['constraint'] >= 0 else -1 for region in regions]
+        self._frontiers = {}
+
+    def frontier(self, pos):
+        """Regiões numeradas ainda abertas em pos e janelas que atravessam pos (em cache)"""
+        cached = self._frontiers.get(pos)
+        if cached is None:
+            open_regions = [region_id for region_id, last in enumerate(self.numbered_last)
+                            if last >= pos]
+            crossing = [index for index, window in enumerate(self.windows)
+                        if window[0] < pos <= window[-1]]
+            cached = self._frontiers[pos] = (open_regions, crossing)
+        return cached
+
+
+class SearchLimitReached(Exception):
+    """
+    A busca foi interrompida por um limite: reason é 'nodes' (orçamento de
+    nós), 'deadline' (tempo), 'cancelled' (token de cancelamento) ou
+    'states' (orçamento da DP de perfil).
+    """
+
+    def __init__(self, count, reason='nodes'):
+        super().__init__(count, reason)
+        self.count = count
+        self.reason = reason
+
+
+class TranspositionTable:
+    """
+    Memória de fronteiras sem solução: assinatura → subárvore que já foi
+    esgotada sem achar nada. Guarda no máximo capacity entradas e descarta
+    a usada há mais tempo (LRU).
+    """
+
+    def __init__(self, capacity=200000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        """True se a fronteira já é conhecida como sem solução"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def store(self, key):
+        self.entries[key] = None
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {'entries': len(self.entries), 'capacity': self.capacity, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+class WhiteConnectivity:
+    """
+    REGRA 2 incremental: union-find com rollback sobre as células pretas.
+
+    Pretas vizinhas na diagonal e a moldura do tabuleiro formam um grafo.
+    Uma nova preta divide as células não-pretas exatamente quando fecha um
+    ciclo nesse grafo. Como pretas nunca são ortogonalmente adjacentes
+    (REGRA 1), basta olhar as 4 diagonais da célula e a moldura.
+    """
+
+    def __init__(self, index):
+        size = index.size
+        self.size = size
+        self.index = index
+        self.border = size * size
+        self.parent = list(range(size * size + 1))
+        self.weight = [1] * (size * size + 1)
+        self.black = bytearray(size * size)
+        self.history = []
+        self.components = 1
+
+    def _find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def _touching_roots(self, pos):
+        """Raízes das pretas diagonais (e da moldura) que tocam a célula"""
+        roots = []
+        if self.index.on_edge[pos]:
+            roots.append(self._find(self.border))
+        black = self.black
+        for diagonal in self.index.diagonals[pos]:
+            if black[diagonal]:
+                roots.append(self._find(diagonal))
+        return roots
+
+    def splits(self, pos):
+        """Quantas componentes não-pretas novas surgiriam ao pintar pos de preto"""
+        roots = self._touching_roots(pos)
+        return len(roots) - len(set(roots))
+
+    def add_black(self, pos):
+        """Pinta pos de preto; retorna False se isso desconectar as não-pretas"""
+        roots = self._touching_roots(pos)
+        distinct = set(roots)
+        new_components = len(roots) - len(distinct)
+        self.black[pos] = 1
+        root = pos
+        merged = []
+        for other in distinct:
+            if self.weight[other] > self.weight[root]:
+                root, other = other, root
+            self.parent[other] = root
+            self.weight[root] += self.weight[other]
+            merged.append(other)
+        self.history.append((pos, merged, new_components))
+        self.components += new_components
+        return new_components == 0
+
+    def remove_black(self):
+        """Desfaz a última preta adicionada"""
+        pos, merged, new_components = self.history.pop()
+        for other in reversed(merged):
+            root = self.parent[other]
+            self.weight[root] -= self.weight[other]
+            self.parent[other] = other
+        self.black[pos] = 0
+        self.components -= new_components
+
+    def rebuild(self, grid):
+        """Reconstrói o estado a partir de uma grade"""
+        while self.history:
+            self.remove_black()
+        for i in range(self.size):
+            for j in range(self.size):
+                if grid[i][j] == 2:
+                    self.add_black(i * self.size + j)
+
+    def connected(self):
+        return self.components == 1
+
+
+def print_progress(solver):
+    """Callback de progresso padrão (console)"""
+    print(f"  Tentativas: {solver.attempts:,}, Backtracks: {solver.backtracks:,}")
+
+
+def draw_board(size, get_border_chars, cell_text, title="HEYAWAKE"):
+    """
+    Desenha um tabuleiro com as bordas das regiões. get_border_chars(i, j)
+    dá (cima, baixo, esquerda, direita) e cell_text(i, j) o conteúdo de 3
+    caracteres da célula.
+    """
+    print("\n" + "="*60)
+    print(f"{title} - Problema NP-Completo")
+    print("="*60)
+    
+    print("    ", end="")
+    for j in range(size):
+        print(f"  {j} ", end="")
+    print()
+    
+    for i in range(size):
+        print("    ", end="")
+        for j in range(size):
+            top_border, _, left_border, right_border = get_border_chars(i, j)
+            
+            if top_border:
+                print("┌───" if left_border else "────", end="")
+                print("┐" if right_border and j == size - 1 else "─" if j < size - 1 else "┐", end="")
+            else:
+                print("│   " if left_border else "    ", end="")
+                print("│" if right_border and j == size - 1 else " " if j < size - 1 else "│", end="")
+        print()
+        
+        print(f" {i:2} ", end="")
+        for j in range(size):
+            _, _, left_border, right_border = get_border_chars(i, j)
+            print("│" if left_border else " ", end="")
+            print(cell_text(i, j), end="")
+            print("│" if right_border else " ", end="")
+        print()
+    
+    print("    ", end="")
+    for j in range(size):
+        _, bottom_border, left_border, right_border = get_border_chars(size - 1, j)
+        
+        if bottom_border:
+            print("└───" if left_border else "────", end="")
+            print("┘" if right_border and j == size - 1 else "─" if j < size - 1 else "┘", end="")
+        else:
+            print("│   " if left_border else "    ", end="")
+            print("│" if right_border and j == size - 1 else " " if j < size - 1 else "│", end="")
+    print()
+    print("="*60)
+
+
 class HeyawakeSolver:
-    def __init__(self, size=8):
+    def __init__(self, size=8, region_map=None, constraints=None, rng=None, index=None):
+        if region_map is not None and isinstance(region_map[0], (list, tuple)):
+            size = len(region_map)
         self.size = size
         self.grid = [[0 for _ in range(size)] for _ in range(size)]
         self.regions = []
         self.region_map = [[-1 for _ in range(size)] for _ in range(size)]
+        self.trail = []
+        self.path = []
+        self.solutions = []
+        self.propagation = True
         self.attempts = 0
         self.backtracks = 0
-        self.generate_puzzle()
+        self.forced = 0
+        self.branched = 0
+        self.node_limit = None
+        self.progress_interval = 50000
+        self.progress_callback = print_progress
+        self.deadline = None
+        self.cancel_token = None
+        self.limit_check_interval = 100
+        self.best_depth = -1
+        self.best_partial = None
+        self.next_checkpoint = self.progress_interval
+        self.transpositions = None
+        if region_map is None:
+            self.generate_puzzle(rng)
+        else:
+            self.load_regions(region_map, constraints, index)
     
-    def generate_puzzle(self):
+    def generate_puzzle(self, rng=None):
         """Gera regiões retangulares cobrindo todo o tabuleiro com constraints balanceadas"""
-        region_id = 0
-        cells_used = [[False for _ in range(self.size)] for _ in range(self.size)]
+        _, region_map, constraints = PuzzleGenerator(rng=rng or random).generate(self.size)
+        self.load_regions(region_map, constraints)
+    
+    def load_regions(self, region_map, constraints, index=None):
+        """
+        Carrega um tabuleiro já pronto em O(células): mapa de regiões (lista
+        de linhas ou plano, indexado por r * size + c) e números (-1 = sem número).
+        Um BoardIndex já construído para o mesmo tabuleiro pode ser reaproveitado.
+        """
+        self.regions = [{'id': region_id, 'cells': [], 'constraint': constraint}
+                        for region_id, constraint in enumerate(constraints)]
+        flat = not isinstance(region_map[0], (list, tuple))
+        if flat and len(region_map) != self.size * self.size:
+            raise ValueError("Mapa de regiões plano não tem size * size células")
         
         for i in range(self.size):
             for j in range(self.size):
-                if not cells_used[i][j]:
-                    max_width = self.size - j
-                    max_height = self.size - i
-                    
-                    # Tenta criar um retângulo maior (máx 4x4)
-                    width = random.randint(1, min(4, max_width))
-                    height = random.randint(1, min(4, max_height))
-                    
-                    actual_width = 0
-                    actual_height = 0
-                    
-                    # Determina a largura máxima real
-                    for w in range(1, width + 1):
-                        if j + w - 1 < self.size and not cells_used[i][j + w - 1]:
-                            actual_width = w
-                        else:
-                            break
-                            
-                    # Determina a altura máxima real
-                    for h in range(1, height + 1):
-                        row_ok = True
-                        if i + h - 1 < self.size:
-                            for c in range(j, j + actual_width):
-                                if cells_used[i + h - 1][c]:
-                                    row_ok = False
-                                    break
-                            if row_ok:
-                                actual_height = h
-                            else:
-                                break
-                        else:
-                            break
-                    
-                    width = actual_width if actual_width > 0 else 1
-                    height = actual_height if actual_height > 0 else 1
-                    
-                    # Garante que é no mínimo 1x1
-                    if width == 0 or height == 0:
-                        width = 1
-                        height = 1
-
-                    region_cells = []
-                    for r in range(i, i + height):
-                        for c in range(j, j + width):
-                            if r < self.size and c < self.size and not cells_used[r][c]:
-                                cells_used[r][c] = True
-                                self.region_map[r][c] = region_id
-                                region_cells.append((r, c))
-                    
-                    if not region_cells:
-                        continue 
-                        
-                    region_size = len(region_cells)
-                    
-                    # Tabuleiros maiores = mais constraints
-                    constraint = -1
-                    
-                    if region_size > 1:  # Só coloca constraint em regiões com 2+ células
-                        # Probabilidade escalonada:
-                        # 4x4 (16 células) → ~40% de chance
-                        # 6x6 (36 células) → ~50% de chance
-                        # 8x8 (64 células) → ~60% de chance
-                        # 10x10 (100 células) → ~70% de chance
-                        
-                        base_probability = 0.35
-                        size_factor = (self.size - 4) / 6  # Normaliza entre 0 (tamanho 4) e 1 (tamanho 10)
-                        probability = min(0.75, base_probability + (0.35 * size_factor))
-                        
-                        if random.random() < probability:
-                            # Gera constraint inteligente baseada no tamanho da região
-                            # Regiões maiores podem ter mais pretos
-                            if region_size <= 2:
-                                max_blacks = 1
-                            elif region_size <= 4:
-                                max_blacks = min(2, region_size // 2)
-                            elif region_size <= 6:
-                                max_blacks = min(3, region_size // 2)
-                            else:
-                                max_blacks = min(4, region_size // 2)
-                            
-                            # Gera valor entre 0 e max_blacks
-                            constraint = random.randint(0, max_blacks)
-                    
-                    self.regions.append({
-                        'id': region_id,
-                        'cells': region_cells,
-                        'constraint': constraint
-                    })
-                    region_id += 1
-        
-        total_cells = sum(len(r['cells']) for r in self.regions)
-        assert total_cells == self.size * self.size
+                region_id = region_map[i * self.size + j] if flat else region_map[i][j]
+                self.region_map[i][j] = region_id
+                self.regions[region_id]['cells'].append((i, j))
+        
+        if any(not region['cells'] for region in self.regions):
+            raise ValueError("Toda região precisa de pelo menos uma célula")
+        
+        self.index = index or BoardIndex(self.size, self.region_map, self.regions)
+        self.connectivity = WhiteConnectivity(self.index)
+        self.region_blacks = [0] * len(self.regions)
+        self.region_empty = [len(r['cells']) for r in self.regions]
+    
+    def reset(self):
+        """Esvazia a grade e zera a busca para resolver de novo (o índice é mantido)"""
+        self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        self.trail = []
+        self.path = []
+        self.solutions = []
+        self.sync_state()
+        self.reset_stats()
+    
+    @classmethod
+    def from_record(cls, view, index=None):
+        """
+        Solver a partir de um registro do corpus (corpus.RecordView), lendo o
+        mapa e os números direto da memória mapeada; se o registro tiver
+        solução, ela vem preenchida na grade.
+        """
+        game = cls(view.size, region_map=view.region_map, constraints=view.constraints,
+                   index=index)
+        solution = view.solution
+        if solution is not None:
+            game.grid = solution
+            game.sync_state()
+        return game
+
+    def export_puzzle(self):
+        """Tabuleiro serializável: tamanho, mapa de regiões e números"""
+        return {
+            'size': self.size,
+            'region_map': [row[:] for row in self.region_map],
+            'constraints': [region['constraint'] for region in self.regions],
+        }
     
     def is_valid_placement(self, row, col, value):
         """
         REGRA 1: Células pretas NÃO podem ser adjacentes ortogonalmente
         """
         if value == 2:  # Tentando colocar PRETO
-            for dr, dc in [(-1,0), (0,1), (1,0), (0,-1)]:
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.size and 0 <= nc < self.size:
-                    if self.grid[nr][nc] == 2:
-                        return False
+            grid = self.grid
+            for nr, nc in self.index.neighbours[row * self.size + col]:
+                if grid[nr][nc] == 2:
+                    return False
         return True
     
     def check_no_adjacent_blacks(self):
@@ -134,11 +430,9 @@ class HeyawakeSolver:
         for i in range(self.size):
             for j in range(self.size):
                 if self.grid[i][j] == 2:
-                    for dr, dc in [(-1,0), (0,1), (1,0), (0,-1)]:
-                        ni, nj = i + dr, j + dc
-                        if 0 <= ni < self.size and 0 <= nj < self.size:
-                            if self.grid[ni][nj] == 2:
-                                return False
+                    for ni, nj in self.index.neighbours[i * self.size + j]:
+                        if self.grid[ni][nj] == 2:
+                            return False
         return True
     
     def check_region_constraint(self, region_id):
@@ -164,223 +458,626 @@ class HeyawakeSolver:
         
         return True
     
-    def check_white_connectivity_partial(self):
-        """REGRA 2: Verifica conectividade parcial"""
-        white_cells = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 1:
-                    white_cells.append((i, j))
+    def set_cell(self, row, col, value):
+        """Atribui uma célula mantendo as estruturas incrementais em dia"""
+        self.grid[row][col] = value
+        region_id = self.region_map[row][col]
+        self.region_empty[region_id] -= 1
+        if value == 2:
+            self.region_blacks[region_id] += 1
+            self.connectivity.add_black(row * self.size + col)
+
+    def clear_cell(self, row, col):
+        """Esvazia uma célula (sempre na ordem inversa das atribuições)"""
+        region_id = self.region_map[row][col]
+        self.region_empty[region_id] += 1
+        if self.grid[row][col] == 2:
+            self.region_blacks[region_id] -= 1
+            self.connectivity.remove_black()
+        self.grid[row][col] = 0
+
+    def try_assign(self, row, col, value):
+        """Atribui e registra no trail se todas as verificações parciais aceitarem"""
+        if not self.is_valid_placement(row, col, value):
+            return False
         
-        if len(white_cells) <= 1:
+        self.set_cell(row, col, value)
+        if (self.check_region_constraint(self.region_map[row][col]) and
+                self.check_white_connectivity_partial() and
+                (value != 1 or self.check_white_line_regions_partial(row, col)) and
+                self.check_region_isolation_at(row, col)):
+            self.trail.append((row, col))
             return True
         
-        visited = [[False for _ in range(self.size)] for _ in range(self.size)]
-        queue = deque([white_cells[0]])
-        visited[white_cells[0][0]][white_cells[0][1]] = True
-        reachable_white_cells = 0
-        
-        while queue:
-            r, c = queue.popleft()
-            
-            if self.grid[r][c] == 1:
-                reachable_white_cells += 1
-                
-            for dr, dc in [(0,1), (1,0), (0,-1), (-1,0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.size and 0 <= nc < self.size:
-                    if not visited[nr][nc]:
-                        if self.grid[nr][nc] == 1 or self.grid[nr][nc] == 0:
-                            visited[nr][nc] = True
-                            queue.append((nr, nc))
-                            
-        return reachable_white_cells == len(white_cells)
+        self.clear_cell(row, col)
+        return False
+
+    def undo(self, mark):
+        """Desfaz as atribuições do trail até a marca"""
+        trail = self.trail
+        while len(trail) > mark:
+            row, col = trail.pop()
+            self.clear_cell(row, col)
+
+    def check_white_connectivity_partial(self):
+        """REGRA 2: Verifica conectividade parcial
+
+        As células não-pretas (brancas e vazias) precisam formar uma única
+        componente; um bolsão separado sempre acabaria com brancas isoladas.
+        """
+        return self.connectivity.connected()
     
     def check_white_connectivity_final(self):
-        """REGRA 2: Validação FINAL"""
-        white_cells = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 1:
-                    white_cells.append((i, j))
-        
-        if not white_cells:
-            return False 
-        
-        visited = [[False for _ in range(self.size)] for _ in range(self.size)]
-        queue = deque([white_cells[0]])
-        visited[white_cells[0][0]][white_cells[0][1]] = True
-        count = 1
-        
-        while queue:
-            r, c = queue.popleft()
-            for dr, dc in [(0,1), (1,0), (0,-1), (-1,0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.size and 0 <= nc < self.size:
-                    if not visited[nr][nc] and self.grid[nr][nc] == 1:
-                        visited[nr][nc] = True
-                        queue.append((nr, nc))
-                        count += 1
-        
-        return count == len(white_cells)
+        """
+        REGRA 2: Validação FINAL - busca só pelas brancas, sem depender do
+        union-find (que não enxerga pretas adjacentes nem células vazias)
+        """
+        grid = self.grid
+        size = self.size
+        neighbours = self.index.neighbours
+        whites = sum(row.count(1) for row in grid)
+        if not whites:
+            return False
+
+        start = next(i * size + row.index(1) for i, row in enumerate(grid) if 1 in row)
+        visited = bytearray(size * size)
+        visited[start] = 1
+        stack = [start]
+        reached = 1
+        while stack:
+            pos = stack.pop()
+            for nr, nc in neighbours[pos]:
+                other = nr * size + nc
+                if grid[nr][nc] == 1 and not visited[other]:
+                    visited[other] = 1
+                    reached += 1
+                    stack.append(other)
+        return reached == whites
     
     def check_white_line_regions_partial(self, r, c):
-        """REGRA 4: Verificação parcial"""
+        """REGRA 4: Verificação parcial (só as janelas que contêm a célula)"""
         if self.grid[r][c] != 1: return True
-
-        # Horizontal
-        regions_h = set()
-        start_c = c
-        while start_c >= 0 and self.grid[r][start_c] == 1:
-            start_c -= 1
-        start_c += 1
-        
-        temp_c = start_c
-        while temp_c < self.size and self.grid[r][temp_c] == 1:
-            regions_h.add(self.region_map[r][temp_c])
-            temp_c += 1
-            
-        if len(regions_h) > 2:
-            return False
-
-        # Vertical
-        regions_v = set()
-        start_r = r
-        while start_r >= 0 and self.grid[start_r][c] == 1:
-            start_r -= 1
-        start_r += 1
         
-        temp_r = start_r
-        while temp_r < self.size and self.grid[temp_r][c] == 1:
-            regions_v.add(self.region_map[temp_r][c])
-            temp_r += 1
-
-        if len(regions_v) > 2:
-            return False
-            
+        grid = self.grid
+        window_cells = self.index.window_cells
+        for index in self.index.windows_by_cell[r * self.size + c]:
+            if all(grid[wr][wc] == 1 for wr, wc in window_cells[index]):
+                return False
         return True
 
     def check_white_line_regions_final(self):
         """REGRA 4: Validação FINAL"""
-        # Horizontais
-        for i in range(self.size):
-            j = 0
-            while j < self.size:
-                if self.grid[i][j] == 1:
-                    regions = set()
-                    while j < self.size and self.grid[i][j] == 1:
-                        regions.add(self.region_map[i][j])
-                        j += 1
-                    if len(regions) > 2:
-                        return False
-                else:
-                    j += 1
-        
-        # Verticais
-        for j in range(self.size):
-            i = 0
-            while i < self.size:
-                if self.grid[i][j] == 1:
-                    regions = set()
-                    while i < self.size and self.grid[i][j] == 1:
-                        regions.add(self.region_map[i][j])
-                        i += 1
-                    if len(regions) > 2:
-                        return False
-                else:
-                    i += 1
-        
+        grid = self.grid
+        for cells in self.index.window_cells:
+            if all(grid[wr][wc] == 1 for wr, wc in cells):
+                return False
         return True
     
+    def region_can_exit(self, region_id):
+        """REGRA 5 para uma região: a primeira branca alcança alguma célula de fora?"""
+        region = self.regions[region_id]
+        if len(region['cells']) == self.region_blacks[region_id] + self.region_empty[region_id]:
+            return True  # Sem brancas
+        
+        grid = self.grid
+        region_map = self.region_map
+        neighbours = self.index.neighbours
+        start = next((r, c) for r, c in region['cells'] if grid[r][c] == 1)
+        stack = [start]
+        visited = {start}
+        while stack:
+            r, c = stack.pop()
+            for nr, nc in neighbours[r * self.size + c]:
+                if grid[nr][nc] == 2 or (nr, nc) in visited:
+                    continue
+                if region_map[nr][nc] != region_id:
+                    return True
+                visited.add((nr, nc))
+                stack.append((nr, nc))
+        return False
+    
     def check_white_region_isolation(self):
         """REGRA 5: Evita isolamento de brancos"""
-        regions_with_whites = set(self.region_map[r][c] 
-                                  for r in range(self.size) 
-                                  for c in range(self.size) 
-                                  if self.grid[r][c] == 1)
-        
-        for region_id in regions_with_whites:
-            start_cell = next(((r, c) for r, c in self.regions[region_id]['cells'] if self.grid[r][c] == 1), None)
-            
-            if start_cell is None: continue
-            
-            r_start, c_start = start_cell
-            queue = deque([(r_start, c_start)])
-            visited = set([(r_start, c_start)])
-            can_exit_region = False
-            
-            while queue:
-                r, c = queue.popleft()
-
-                if self.region_map[r][c] != region_id:
-                    can_exit_region = True
-                    continue 
-
-                for dr, dc in [(0,1), (1,0), (0,-1), (-1,0)]:
-                    nr, nc = r + dr, c + dc
-                    
-                    if 0 <= nr < self.size and 0 <= nc < self.size:
-                        is_path = (self.grid[nr][nc] != 2)
-                        
-                        if is_path and (nr, nc) not in visited:
-                            if self.region_map[nr][nc] != region_id:
-                                can_exit_region = True
-                            
-                            visited.add((nr, nc))
-                            queue.append((nr, nc))
-                            
-            if not can_exit_region:
+        return all(self.region_can_exit(region['id']) for region in self.regions)
+    
+    def check_region_isolation_at(self, row, col):
+        """
+        REGRA 5 incremental: só a região da célula e as regiões vizinhas
+        dependem dela; todas as outras já passavam no nó anterior.
+        """
+        region_map = self.region_map
+        touched = {region_map[row][col]}
+        for nr, nc in self.index.neighbours[row * self.size + col]:
+            touched.add(region_map[nr][nc])
+        return all(self.region_can_exit(region_id) for region_id in touched)
+    
+    def white_run_ok(self, row, col):
+        """REGRA 4 preditiva: a célula vazia pode virar branca sem completar uma janela de 3 regiões?"""
+        grid = self.grid
+        window_cells = self.index.window_cells
+        for index in self.index.windows_by_cell[row * self.size + col]:
+            if all(grid[wr][wc] == 1 or (wr == row and wc == col) for wr, wc in window_cells[index]):
                 return False
-                
         return True
     
-    def solve(self, pos=0):
+    def forced_value(self, row, col):
+        """
+        Valor forçado de uma célula vazia: 1, 2, None (livre) ou 0 (contradição).
+
+        Preto é proibido ao lado de outro preto, numa região já completa ou
+        se isolar as não-pretas; branco é proibido se a região precisa de
+        todas as vazias restantes ou se a linha branca cruzaria 3 regiões.
+        """
+        region_id = self.region_map[row][col]
+        constraint = self.regions[region_id]['constraint']
+        
+        black_ok = (self.is_valid_placement(row, col, 2) and
+                    (constraint < 0 or self.region_blacks[region_id] < constraint) and
+                    not self.connectivity.splits(row * self.size + col))
+        white_ok = ((constraint < 0 or
+                     self.region_blacks[region_id] + self.region_empty[region_id] > constraint) and
+                    self.white_run_ok(row, col))
+        
+        if black_ok and white_ok:
+            return None
+        if black_ok:
+            return 2
+        if white_ok:
+            return 1
+        return 0
+    
+    def propagate(self):
+        """Força células até um ponto fixo; retorna False se houver contradição"""
+        changed = True
+        while changed:
+            changed = False
+            for i in range(self.size):
+                for j in range(self.size):
+                    if self.grid[i][j] != 0:
+                        continue
+                    value = self.forced_value(i, j)
+                    if value is None:
+                        continue
+                    if value == 0 or not self.try_assign(i, j, value):
+                        return False
+                    self.forced += 1
+                    changed = True
+        return True
+    
+    def select_row_major(self, start):
+        """Primeira célula vazia em ordem linha a linha a partir de start"""
+        total = self.size * self.size
+        pos = start
+        while pos < total and self.grid[pos // self.size][pos % self.size] != 0:
+            pos += 1
+        return pos if pos < total else None
+    
+    def legal_values(self, row, col):
+        """Quantos valores passam por todas as verificações parciais"""
+        count = 0
+        for value in [1, 2]:
+            mark = len(self.trail)
+            if self.try_assign(row, col, value):
+                self.undo(mark)
+                count += 1
+        return count
+    
+    def region_slack(self, region_id):
+        """Folga de uma região numerada: vazias que ainda podem ficar brancas"""
+        constraint = self.regions[region_id]['constraint']
+        if constraint < 0:
+            return self.size * self.size
+        return self.region_empty[region_id] - (constraint - self.region_blacks[region_id])
+    
+    def select_most_constrained(self, start):
+        """MRV: célula com menos valores legais (empate → menor folga da região)"""
+        best, best_key = None, None
+        for pos in range(self.size * self.size):
+            row, col = divmod(pos, self.size)
+            if self.grid[row][col] != 0:
+                continue
+            count = self.legal_values(row, col)
+            if count <= 1:
+                return pos
+            key = (count, self.region_slack(self.region_map[row][col]))
+            if best_key is None or key < best_key:
+                best, best_key = pos, key
+        return best
+    
+    def select_region_slack(self, start):
+        """Primeira célula vazia da região numerada com menor folga"""
+        best, best_key = None, None
+        for region in self.regions:
+            region_id = region['id']
+            empty = self.region_empty[region_id]
+            if region['constraint'] < 0 or empty == 0:
+                continue
+            key = (self.region_slack(region_id), empty)
+            if best_key is None or key < best_key:
+                best, best_key = region, key
+        
+        if best is None:
+            return self.select_row_major(0)
+        for r, c in best['cells']:
+            if self.grid[r][c] == 0:
+                return r * self.size + c
+    
+    def select_max_degree(self, start):
+        """Célula vazia presente em mais janelas de 3 regiões ainda sem preto"""
+        grid = self.grid
+        open_windows = [not any(grid[r][c] == 2 for r, c in cells)
+                        for cells in self.index.window_cells]
+        best, best_degree = None, -1
+        for pos in range(self.size * self.size):
+            if grid[pos // self.size][pos % self.size] != 0:
+                continue
+            degree = sum(1 for index in self.index.windows_by_cell[pos] if open_windows[index])
+            if degree > best_degree:
+                best, best_degree = pos, degree
+        return best
+    
+    def select_cell(self, start, strategy='row-major'):
+        """Próxima célula de ramificação segundo a estratégia (None = tabuleiro completo)"""
+        return getattr(self, BRANCHING_STRATEGIES[strategy])(start)
+    
+    def is_solved(self):
+        """Verificação final de um tabuleiro completo"""
+        return (self.check_no_adjacent_blacks() and
+                self.check_white_connectivity_final() and 
+                self.check_white_line_regions_final() and
+                self.check_final_constraints())
+    
+    def reset_stats(self):
+        """Zera os contadores da busca (o tabuleiro não é alterado)"""
+        self.attempts = 0
+        self.backtracks = 0
+        self.forced = 0
+        self.branched = 0
+        self.best_depth = -1
+        self.best_partial = None
+        self.schedule_checkpoint()
+    
+    def limit_nodes(self, node_limit):
+        """Interrompe a busca com SearchLimitReached após node_limit tentativas"""
+        self.node_limit = node_limit
+        self.schedule_checkpoint()
+    
+    def set_limits(self, time_limit=None, node_limit=None, cancel_token=None):
+        """
+        Limites cooperativos, conferidos a cada limit_check_interval nós:
+        time_limit em segundos a partir de agora, node_limit em tentativas e
+        cancel_token qualquer objeto com is_set() (threading.Event,
+        multiprocessing.Event...). Estourar um deles levanta SearchLimitReached.
+        """
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.cancel_token = cancel_token
+        self.limit_nodes(node_limit)
+    
+    def set_progress(self, interval, callback=print_progress):
+        """
+        Chama callback(solver) a cada interval tentativas. interval None ou 0
+        (modo silencioso) tira o progresso da busca: só o limite de nós,
+        se houver, continua marcando nós.
+        """
+        self.progress_interval = interval or None
+        self.progress_callback = callback
+        self.schedule_checkpoint()
+    
+    def schedule_checkpoint(self):
+        """Próxima tentativa em que checkpoint() precisa rodar"""
+        targets = []
+        if self.progress_interval:
+            targets.append((self.attempts // self.progress_interval + 1) * self.progress_interval)
+        if self.node_limit is not None:
+            targets.append(self.node_limit + 1)
+        if self.deadline is not None or self.cancel_token is not None:
+            interval = self.limit_check_interval
+            targets.append((self.attempts // interval + 1) * interval)
+        self.next_checkpoint = min(targets) if targets else float('inf')
+    
+    def checkpoint(self):
+        """Chamado só em nós marcados: progresso e limite de nós"""
+        if self.node_limit is not None and self.attempts > self.node_limit:
+            raise SearchLimitReached(self.attempts, 'nodes')
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchLimitReached(self.attempts, 'deadline')
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            raise SearchLimitReached(self.attempts, 'cancelled')
+        
+        if (self.progress_interval and self.progress_callback is not None and
+                self.attempts % self.progress_interval == 0):
+            self.progress_callback(self)
+        
+        self.schedule_checkpoint()
+    
+    def use_transposition_table(self, capacity=200000):
+        """
+        Liga a memória de fronteiras sem solução (só na estratégia
+        row-major, onde toda célula antes da ramificação já está atribuída);
+        capacity=None desliga. Entradas continuam válidas após reset().
+        """
+        self.transpositions = TranspositionTable(capacity) if capacity else None
+
+    def frontier_signature(self, pos):
+        """
+        Hash canônico de tudo que ainda influencia a busca a partir de pos,
+        com todas as células antes de pos atribuídas:
+          - cores da última linha antes de pos e das células a partir de pos;
+          - pretas das regiões numeradas ainda abertas;
+          - janelas da REGRA 4 que atravessam pos e ainda estão todas brancas;
+          - componentes das não-pretas da fronteira (ligações pelo passado);
+          - região única das não-pretas do passado, se houver só uma (REGRA 5).
+        """
+        size = self.size
+        flat = b''.join(map(bytes, self.grid))
+        open_regions, crossing = self.index.frontier(pos)
+
+        region_map = self.region_map
+        parent = list(range(pos))
+        past_region = -1
+        for p in range(pos):
+            if flat[p] == 2:
+                continue
+            row, col = divmod(p, size)
+            region_id = region_map[row][col]
+            if past_region == -1:
+                past_region = region_id
+            elif past_region != region_id:
+                past_region = -2
+            for q in ((p - 1,) if col else ()) + ((p - size,) if p >= size else ()):
+                if flat[q] == 2:
+                    continue
+                while parent[q] != q:
+                    q = parent[q]
+                root = p
+                while parent[root] != root:
+                    root = parent[root]
+                parent[max(root, q)] = min(root, q)
+
+        labels = bytearray()
+        names = {}
+        for p in range(max(0, pos - size), pos):
+            if flat[p] == 2:
+                labels.append(0)
+                continue
+            while parent[p] != p:
+                p = parent[p]
+            labels.append(names.setdefault(p, len(names) + 1))
+
+        windows = self.index.windows
+        alive = bytes(all(flat[q] == 1 for q in windows[index] if q < pos) for index in crossing)
+        blacks = bytes(self.region_blacks[region_id] for region_id in open_regions)
+        key = b''.join((pos.to_bytes(2, 'little'), flat[max(0, pos - size):], blacks, alive,
+                        bytes(labels), past_region.to_bytes(2, 'little', signed=True)))
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def solve(self, pos=0, strategy='row-major'):
         """Resolve com validações COMPLETAS e PREDITIVAS"""
         self.attempts += 1
         
-        if self.attempts % 50000 == 0:
-            print(f"  Tentativas: {self.attempts:,}, Backtracks: {self.backtracks:,}")
+        if self.attempts >= self.next_checkpoint:
+            self.checkpoint()
+        
+        mark = len(self.trail)
+        if self.propagation and not self.propagate():
+            self.undo(mark)
+            return False
+        
+        pos = self.select_cell(pos, strategy)
         
-        if pos >= self.size * self.size:
-            return (self.check_no_adjacent_blacks() and
-                    self.check_white_connectivity_final() and 
-                    self.check_white_line_regions_final() and
-                    self.check_final_constraints())
+        if pos is None:
+            if self.is_solved():
+                return True
+            self.undo(mark)
+            return False
+        
+        key = None
+        if self.transpositions is not None and strategy == 'row-major':
+            key = self.frontier_signature(pos)
+            if self.transpositions.lookup(key):
+                self.undo(mark)
+                return False
         
         row = pos // self.size
         col = pos % self.size
+        branch_mark = len(self.trail)
         
         for value in [1, 2]:
-            if not self.is_valid_placement(row, col, value):
+            if not self.try_assign(row, col, value):
                 continue
             
-            self.grid[row][col] = value
+            self.branched += 1
+            self.path.append((pos, value))
+            if self.solve(pos + 1, strategy):
+                return True
             
-            region_id = self.region_map[row][col]
-            if not self.check_region_constraint(region_id):
-                self.grid[row][col] = 0
-                continue
+            self.path.pop()
+            self.undo(branch_mark)
+            self.backtracks += 1
+        
+        self.undo(mark)
+        if key is not None:
+            self.transpositions.store(key)
+        return False
+    
+    def solve_iterative(self, strategy='row-major'):
+        """
+        Mesma busca de solve() (mesma ordem e mesmos contadores), mas com
+        uma pilha explícita de quadros [célula, próximo valor, marca do
+        trail, marca da ramificação, filho em andamento, assinatura da
+        fronteira, soluções na entrada] no lugar da recursão.
+        """
+        return self.search(strategy, limit=1) == 1
+    
+    def count_solutions(self, limit=2, strategy='row-major'):
+        """
+        Conta soluções, parando assim que encontrar limit delas.
+        As grades encontradas ficam em self.solutions.
+        """
+        self.solutions = []
+        return self.search(strategy, limit)
+    
+    def search(self, strategy='row-major', limit=1, resume=()):
+        """
+        Busca iterativa: para na limit-ésima solução (deixando-a na grade)
+        ou esgota a árvore; retorna quantas soluções encontrou.
+        
+        resume é o caminho de decisões [(célula, valor), ...] salvo por
+        search_state(): a pilha é reconstruída refazendo cada decisão (com
+        a mesma propagação) e a busca continua do nó onde parou.
+        """
+        stack = []
+        start = 0
+        found = 0
+        
+        for pos, value in resume:
+            mark = len(self.trail)
+            if self.propagation and not self.propagate():
+                raise ValueError("Estado salvo não corresponde ao tabuleiro")
+            branch_mark = len(self.trail)
+            if not self.try_assign(pos // self.size, pos % self.size, value):
+                raise ValueError("Estado salvo não corresponde ao tabuleiro")
+            self.path.append((pos, value))
+            stack.append([pos, value, mark, branch_mark, True, None, found])
+            start = pos + 1
+        
+        while True:
+            # Entrada de um nó
+            self.attempts += 1
             
-            if not self.check_white_connectivity_partial():
-                self.grid[row][col] = 0
-                continue
+            if self.attempts >= self.next_checkpoint:
+                self.checkpoint()
             
-            if value == 1:
-                if not self.check_white_line_regions_partial(row, col):
-                    self.grid[row][col] = 0
-                    continue
+            mark = len(self.trail)
+            if self.propagation and not self.propagate():
+                pos = None
+            else:
+                if len(self.trail) > self.best_depth:
+                    self.best_depth = len(self.trail)
+                    self.best_partial = [row[:] for row in self.grid]
+                pos = self.select_cell(start, strategy)
+                if pos is None and self.is_solved():
+                    found += 1
+                    self.solutions.append([row[:] for row in self.grid])
+                    if found >= limit:
+                        return found
             
-            if not self.check_white_region_isolation():
-                self.grid[row][col] = 0
-                continue
+            key = None
+            if pos is not None and self.transpositions is not None and strategy == 'row-major':
+                key = self.frontier_signature(pos)
+                if self.transpositions.lookup(key):
+                    pos = None
             
-            if self.solve(pos + 1):
-                return True
+            if pos is None:
+                self.undo(mark)
+            else:
+                stack.append([pos, 0, mark, len(self.trail), False, key, found])
             
-            self.grid[row][col] = 0
-            self.backtracks += 1
+            # Próximo filho viável, desempilhando quadros esgotados
+            descended = False
+            while stack and not descended:
+                frame = stack[-1]
+                pos = frame[0]
+                
+                if frame[4]:
+                    self.path.pop()
+                    self.undo(frame[3])
+                    self.backtracks += 1
+                    frame[4] = False
+                
+                while frame[1] < 2:
+                    value = frame[1] + 1
+                    frame[1] += 1
+                    if self.try_assign(pos // self.size, pos % self.size, value):
+                        self.branched += 1
+                        self.path.append((pos, value))
+                        frame[4] = True
+                        start = pos + 1
+                        descended = True
+                        break
+                
+                if not descended:
+                    stack.pop()
+                    self.undo(frame[2])
+                    if frame[5] is not None and found == frame[6]:
+                        self.transpositions.store(frame[5])
+            
+            if not descended:
+                return found
+    
+    def search_state(self, strategy='row-major'):
+        """
+        Estado da busca interrompida, serializável em JSON: o tabuleiro, o
+        caminho de decisões até o nó que ia ser explorado e os contadores.
+        """
+        return {
+            'puzzle': self.export_puzzle(),
+            'strategy': strategy,
+            'propagation': self.propagation,
+            'path': [list(step) for step in self.path],
+            'attempts': self.attempts - 1,  # O nó interrompido é refeito na retomada
+            'backtracks': self.backtracks,
+            'forced': self.forced,
+            'branched': self.branched,
+        }
+    
+    def solve_with_limits(self, strategy='row-major', time_limit=None, node_limit=None,
+                          cancel_token=None, resume=None):
+        """
+        Resolve com limites de tempo, de nós e cancelamento cooperativo,
+        sempre devolvendo um resultado estruturado:
+          status       - 'solved', 'unsolvable' (provado) ou 'timeout'
+          reason       - no timeout: 'deadline', 'nodes' ou 'cancelled'
+          solution     - a grade resolvida (ou None)
+          best_partial - a atribuição parcial consistente mais completa vista
+          state        - no timeout: estado para retomar com resume=state
+        Os limites valem para esta chamada (node_limit conta a partir da retomada).
+        """
+        if resume is not None:
+            if resume['puzzle'] != self.export_puzzle():
+                raise ValueError("Estado salvo é de outro tabuleiro")
+            strategy = resume['strategy']
+            self.propagation = resume['propagation']
         
-        return False
+        self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        self.trail = []
+        self.path = []
+        self.solutions = []
+        self.sync_state()
+        self.reset_stats()
+        offset = 0
+        if resume is not None:
+            offset = resume['attempts']
+            self.attempts = offset
+            self.backtracks = resume['backtracks']
+            self.forced = resume['forced']
+            self.branched = resume['branched']
+        self.set_limits(time_limit, None if node_limit is None else offset + node_limit,
+                        cancel_token)
+        
+        start_time = time.perf_counter()
+        result = {'status': 'unsolvable', 'reason': None, 'solution': None, 'state': None}
+        try:
+            path = [tuple(step) for step in resume['path']] if resume is not None else ()
+            if self.search(strategy, limit=1, resume=path):
+                result['status'] = 'solved'
+                result['solution'] = [row[:] for row in self.grid]
+        except SearchLimitReached as limit:
+            result['status'] = 'timeout'
+            result['reason'] = limit.reason
+            result['state'] = self.search_state(strategy)
+        finally:
+            self.set_limits()
+        
+        result.update({
+            'best_partial': result['solution'] or self.best_partial,
+            'assigned': sum(cell != 0 for row in (result['solution'] or self.best_partial or [])
+                            for cell in row),
+            'attempts': self.attempts,
+            'backtracks': self.backtracks,
+            'time': time.perf_counter() - start_time,
+        })
+        return result
     
     def check_final_constraints(self):
         """Valida constraints numéricas finais"""
@@ -392,93 +1089,48 @@ class HeyawakeSolver:
         return True
     
     def get_border_chars(self, i, j):
-        """Calcula bordas da célula"""
-        region_id = self.region_map[i][j]
-        top_border = (i == 0 or self.region_map[i-1][j] != region_id)
-        bottom_border = (i == self.size-1 or self.region_map[i+1][j] != region_id)
-        left_border = (j == 0 or self.region_map[i][j-1] != region_id)
-        right_border = (j == self.size-1 or self.region_map[i][j+1] != region_id)
-        return top_border, bottom_border, left_border, right_border
+        """Bordas da célula (pré-calculadas no índice)"""
+        bits = self.index.borders[i * self.size + j]
+        return (bool(bits & BORDER_TOP), bool(bits & BORDER_BOTTOM),
+                bool(bits & BORDER_LEFT), bool(bits & BORDER_RIGHT))
     
+    def cell_text(self, i, j):
+        """Conteúdo desenhado na célula: ○, ■, o número da região ou vazio"""
+        if self.grid[i][j] == 1:
+            return " ○ "
+        if self.grid[i][j] == 2:
+            return " ■ "
+        region_id = self.index.label_cells.get((i, j))
+        if region_id is not None and self.regions[region_id]['constraint'] >= 0:
+            return f" {self.regions[region_id]['constraint']} "
+        return "   "
+
     def display(self, title="HEYAWAKE"):
         """Exibe o tabuleiro"""
-        print("\n" + "="*60)
-        print(f"{title} - Problema NP-Completo")
-        print("="*60)
-        
-        print("    ", end="")
-        for j in range(self.size):
-            print(f"  {j} ", end="")
-        print()
-        
-        for i in range(self.size):
-            print("    ", end="")
-            for j in range(self.size):
-                top_border, _, left_border, right_border = self.get_border_chars(i, j)
-                
-                if top_border:
-                    print("┌───" if left_border else "────", end="")
-                    print("┐" if right_border and j == self.size - 1 else "─" if j < self.size - 1 else "┐", end="")
-                else:
-                    print("│   " if left_border else "    ", end="")
-                    print("│" if right_border and j == self.size - 1 else " " if j < self.size - 1 else "│", end="")
-            print()
-            
-            print(f" {i:2} ", end="")
-            for j in range(self.size):
-                _, _, left_border, right_border = self.get_border_chars(i, j)
-                
-                print("│" if left_border else " ", end="")
-                
-                region_id = self.region_map[i][j]
-                region = self.regions[region_id]
-                
-                is_top_left = (i, j) == min(region['cells']) if region['cells'] else False
-                constraint = region['constraint'] if is_top_left and region['constraint'] >= 0 else None
-                
-                cell_content = "   "
-                if self.grid[i][j] == 1:
-                    cell_content = " ○ "
-                elif self.grid[i][j] == 2:
-                    cell_content = " ■ "
-                elif constraint is not None:
-                    cell_content = f" {constraint} "
-
-                print(cell_content, end="")
-                print("│" if right_border else " ", end="")
-            print()
-        
-        print("    ", end="")
-        for j in range(self.size):
-            _, bottom_border, left_border, right_border = self.get_border_chars(self.size-1, j)
-            
-            if bottom_border:
-                print("└───" if left_border else "────", end="")
-                print("┘" if right_border and j == self.size - 1 else "─" if j < self.size - 1 else "┘", end="")
-            else:
-                print("│   " if left_border else "    ", end="")
-                print("│" if right_border and j == self.size - 1 else " " if j < self.size - 1 else "│", end="")
-        print()
-        print("="*60)
+        draw_board(self.size, self.get_border_chars, self.cell_text, title)
+    
+    def sync_state(self):
+        """Reconstrói as estruturas incrementais a partir de self.grid"""
+        self.connectivity.rebuild(self.grid)
+        self.region_blacks = [0] * len(self.regions)
+        self.region_empty = [0] * len(self.regions)
+        for region in self.regions:
+            for r, c in region['cells']:
+                if self.grid[r][c] == 2:
+                    self.region_blacks[region['id']] += 1
+                elif self.grid[r][c] == 0:
+                    self.region_empty[region['id']] += 1
     
     def validate_solution(self):
         """Validação completa de todas as regras"""
-        if not self.check_no_adjacent_blacks():
-            return False, "❌ REGRA 1: Células pretas adjacentes ortogonalmente!"
-        
-        if not self.check_white_connectivity_final():
-            return False, "❌ REGRA 2: Células brancas desconectadas!"
-        
-        if not self.check_final_constraints():
-            return False, "❌ REGRA 3: Constraints numéricas violadas!"
-        
-        if not self.check_white_line_regions_final():
-            return False, "❌ REGRA 4: Linha branca contínua cruza 3+ regiões!"
-
-        if not self.check_white_region_isolation():
-            return False, "❌ REGRA 5: Brancos isolados dentro de uma região!"
-        
-        return True, "✅ SOLUÇÃO VÁLIDA!"
+        self.sync_state()
+        checks = [self.check_no_adjacent_blacks, self.check_white_connectivity_final,
+                  self.check_final_constraints, self.check_white_line_regions_final,
+                  self.check_white_region_isolation]
+        for check, message in zip(checks, RULE_FAILURES):
+            if not check():
+                return False, message
+        return True, VALID_SOLUTION
     
     def auto_solve(self):
         """Resolve o puzzle"""
@@ -514,7 +1166,7 @@ class HeyawakeSolver:
         print("\n⏱️  Resolvendo...")
         start_time = time.time()
         
-        solved = self.solve()
+        solved = self.solve_iterative()
         
         elapsed = time.time() - start_time
         
@@ -530,6 +1182,7 @@ class HeyawakeSolver:
             print(f"  ⏱️  Tempo: {elapsed:.3f}s")
             print(f"  🔄 Tentativas: {self.attempts:,}")
             print(f"  ⬅️  Backtracks: {self.backtracks:,}")
+            print(f"  🧩 Forçadas: {self.forced:,} | Ramificadas: {self.branched:,}")
             if elapsed > 0:
                 print(f"  📊 Taxa: {int(self.attempts/elapsed):,} tent/s")
         else:
@@ -540,6 +1193,16 @@ class HeyawakeSolver:
         print("="*60)
 
 
+def create_solver(size=8, backend='list', **kwargs):
+    """Cria um solver com o backend de estado escolhido: 'list' ou 'bitboard'"""
+    if backend == 'list':
+        return HeyawakeSolver(size, **kwargs)
+    if backend == 'bitboard':
+        from bitboard import BitboardHeyawakeSolver
+        return BitboardHeyawakeSolver(size, **kwargs)
+    raise ValueError(f"Backend desconhecido: {backend!r}")
+
+
 def main():
     print("\n" + "="*60)
     print("🎮 HEYAWAKE SOLVER - VERSÃO MELHORADA")
@@ -547,7 +1210,7 @@ def main():
     
     while True:
         print("\n" + "="*60)
-        size_input = input("Tamanho (4-10, Enter=6, 'q'=sair): ").strip()
+        size_input = input("Tamanho (4-20, Enter=6, 'q'=sair): ").strip()
         
         if size_input.lower() == 'q':
             print("👋 Até logo!")
@@ -561,7 +1224,7 @@ def main():
                 break
         
         size = int(size_str) if size_str else 6
-        size = max(4, min(10, size))
+        size = max(4, min(20, size))
         
         print(f"\n📐 Gerando tabuleiro {size}x{size}...")
         game = HeyawakeSolver(size=size)
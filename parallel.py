@@ -0,0 +1,197 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from novo import SearchLimitReached, create_solver
+
+# Busca paralela de UM puzzle: a árvore é expandida até uma profundidade,
+# cada nó da fronteira (lista de decisões (pos, valor) desde a raiz) vira um
+# item de trabalho, e subárvores que estouram o orçamento de nós devolvem o
+# trabalho restante à fila, onde workers ociosos o pegam.
+
+_worker = {}
+
+
+def replay(game, decisions):
+    """Reaplica decisões de ramificação a partir da raiz; False se ficarem inviáveis"""
+    for pos, value in decisions:
+        if game.propagation and not game.propagate():
+            return False
+        if not game.try_assign(pos // game.size, pos % game.size, value):
+            return False
+    return True
+
+
+def expand(game, decisions, strategy):
+    """
+    Expande o nó atual (já reaplicado) um nível.
+    Retorna (filhos, solução): solução é a grade se o nó já for uma folha válida.
+    """
+    mark = len(game.trail)
+    game.attempts += 1
+    try:
+        if game.propagation and not game.propagate():
+            return [], None
+        pos = game.select_cell(0, strategy)
+        if pos is None:
+            return [], ([row[:] for row in game.grid] if game.is_solved() else None)
+
+        children = []
+        for value in [1, 2]:
+            child_mark = len(game.trail)
+            if game.try_assign(pos // game.size, pos % game.size, value):
+                children.append(decisions + [(pos, value)])
+                game.undo(child_mark)
+        return children, None
+    finally:
+        game.undo(mark)
+
+
+def _init_worker(spec, backend, strategy, node_budget):
+    _worker['game'] = create_solver(backend=backend, region_map=spec['region_map'],
+                                    constraints=spec['constraints'])
+    _worker['game'].set_progress(None)
+    _worker['strategy'] = strategy
+    _worker['node_budget'] = node_budget
+
+
+def _explore(decisions):
+    """Resolve a subárvore de decisions com orçamento de nós (roda no worker)"""
+    game = _worker['game']
+    strategy = _worker['strategy']
+    game.undo(0)
+    game.path = []
+    game.limit_nodes(None)
+    game.reset_stats()
+    game.limit_nodes(_worker['node_budget'])
+
+    result = {'status': 'failed', 'nodes': 0, 'backtracks': 0}
+    try:
+        if replay(game, decisions) and game.solve(0, strategy):
+            result['status'] = 'solved'
+            result['solution'] = [row[:] for row in game.grid]
+    except SearchLimitReached:
+        # Orçamento estourado: o caminho atual diz exatamente o que falta.
+        # O nó corrente é retomado e cada irmão "preto" ainda não tentado
+        # vira um novo item, sem repetir o que já foi explorado.
+        path = game.path
+        children = [decisions + path]
+        for depth, (pos, value) in enumerate(path):
+            if value == 1:
+                children.append(decisions + path[:depth] + [(pos, 2)])
+        result['status'] = 'split'
+        result['children'] = children
+    result['nodes'] = game.attempts
+    result['backtracks'] = game.backtracks
+    return result
+
+
+def solve_parallel(game, depth=4, workers=None, node_budget=20000,
+                   strategy='row-major', backend='list'):
+    """
+    Resolve um único puzzle dividindo a árvore de busca entre processos.
+    O primeiro worker que encontra solução cancela todos os demais.
+    Em caso de sucesso a solução validada é escrita em game.grid.
+    """
+    start_time = time.perf_counter()
+    game.undo(0)
+    game.limit_nodes(None)
+    game.reset_stats()
+    stats = {'solved': False, 'solution': None, 'work_items': 0, 'splits': 0}
+
+    # Expansão inicial em largura até a profundidade pedida
+    frontier = [[]]
+    solution = None
+    for _ in range(depth):
+        next_frontier = []
+        for decisions in frontier:
+            if replay(game, decisions):
+                children, solution = expand(game, decisions, strategy)
+                next_frontier.extend(children)
+            game.undo(0)
+            if solution is not None:
+                break
+        frontier = next_frontier
+        if solution is not None:
+            break
+    nodes = game.attempts
+    backtracks = 0
+
+    if solution is None and frontier:
+        results = queue.Queue()
+        pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                    initargs=(game.export_puzzle(), backend, strategy, node_budget))
+        try:
+            pending = 0
+            for decisions in frontier:
+                pool.apply_async(_explore, (decisions,), callback=results.put,
+                                 error_callback=results.put)
+                pending += 1
+            while pending:
+                result = results.get()
+                pending -= 1
+                if isinstance(result, BaseException):
+                    raise result
+                stats['work_items'] += 1
+                nodes += result['nodes']
+                backtracks += result['backtracks']
+                if result['status'] == 'solved':
+                    solution = result['solution']
+                    break
+                if result['status'] == 'split':
+                    stats['splits'] += 1
+                    for child in result['children']:
+                        pool.apply_async(_explore, (child,), callback=results.put,
+                                         error_callback=results.put)
+                        pending += 1
+        finally:
+            pool.terminate()
+            pool.join()
+
+    game.attempts = nodes
+    game.backtracks = backtracks
+    if solution is not None:
+        game.grid = solution
+        game.sync_state()
+        stats['solved'], stats['message'] = game.validate_solution()
+        stats['solution'] = solution
+    stats['nodes'] = nodes
+    stats['backtracks'] = backtracks
+    stats['time'] = time.perf_counter() - start_time
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve um puzzle difícil em paralelo")
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--node-budget', type=int, default=20000)
+    parser.add_argument('--strategy', default='row-major')
+    parser.add_argument('--compare', action='store_true', help="também resolve sequencialmente")
+    args = parser.parse_args()
+
+    game = create_solver(args.size, rng=random.Random(args.seed))
+    spec = game.export_puzzle()
+
+    stats = solve_parallel(game, args.depth, args.workers, args.node_budget, args.strategy)
+    print(f"Paralelo: resolvido={stats['solved']} nós={stats['nodes']:,} "
+          f"itens={stats['work_items']} divisões={stats['splits']} tempo={stats['time']:.3f}s")
+
+    if args.compare:
+        sequential = create_solver(region_map=spec['region_map'], constraints=spec['constraints'])
+        sequential.set_progress(None)
+        start_time = time.perf_counter()
+        solved = sequential.solve(strategy=args.strategy)
+        elapsed = time.perf_counter() - start_time
+        print(f"Sequencial: resolvido={solved} nós={sequential.attempts:,} tempo={elapsed:.3f}s")
+        if elapsed > 0 and stats['time'] > 0:
+            print(f"Speedup: {elapsed / stats['time']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
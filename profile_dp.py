@@ -0,0 +1,222 @@
+import argparse
+import random
+import time
+
+from novo import SearchLimitReached, create_solver
+
+# Programação dinâmica por perfil: as células são decididas em ordem
+# linha a linha e o estado guarda só o que o resto do tabuleiro ainda pode
+# ver. Com largura fixa o número de estados por célula é limitado, então o
+# custo cresce de forma polinomial com a altura, sem depender da semente.
+#
+# Estado após decidir as células 0..p-1:
+#   labels  - as últimas size células: 0 = preta, senão o rótulo canônico
+#             da componente branca (ligações só pelo passado)
+#   closed  - uma componente branca já saiu da fronteira (não cabe mais branca)
+#   counts  - pretas de cada região numerada já iniciada e ainda aberta
+#   alive   - janelas da REGRA 4 em andamento com todas as células brancas
+#   region  - região única das brancas até aqui (-1 = nenhuma, -2 = várias)
+
+WHITE = 1
+BLACK = 2
+
+
+def canonical(labels):
+    """Renumera os rótulos por ordem de primeira aparição"""
+    names = {}
+    return tuple(names.setdefault(label, len(names) + 1) if label else 0 for label in labels)
+
+
+class ProfileSolver:
+    """
+    Conta exatamente as soluções de um tabuleiro e reconstrói quantas forem
+    pedidas. max_states limita os estados por camada (SearchLimitReached).
+    """
+
+    def __init__(self, game, max_states=None):
+        self.game = game
+        self.size = game.size
+        self.max_states = max_states
+        self.peak_states = 0
+        self.layers = None
+
+        size = self.size
+        total = size * size
+        self.region_of = [game.region_map[pos // size][pos % size] for pos in range(total)]
+        self.constraint = [region['constraint'] for region in game.regions]
+
+        # Células restantes da região de cada posição depois dela
+        self.remaining = [0] * total
+        seen = [0] * len(game.regions)
+        for pos in reversed(range(total)):
+            self.remaining[pos] = seen[self.region_of[pos]]
+            seen[self.region_of[pos]] += 1
+
+        windows = game.index.windows
+        self.members = [set(window) for window in windows]
+        self.window_end = [window[-1] for window in windows]
+        self.starting = [[] for _ in range(total)]
+        for index, window in enumerate(windows):
+            self.starting[window[0]].append(index)
+
+    def step(self, state, pos, value):
+        """Estado após pintar pos com value, ou None se alguma regra já foi violada"""
+        labels, closed, counts, alive, region = state
+        size = self.size
+        col = pos % size
+        white = value == WHITE
+        up = labels[0]
+        left = labels[-1] if col else 0
+
+        # REGRA 1
+        if not white and ((pos >= size and up == 0) or (col and left == 0)):
+            return None
+
+        # REGRA 3: contagem da região da célula
+        region_id = self.region_of[pos]
+        constraint = self.constraint[region_id]
+        if constraint >= 0:
+            count = 0
+            for k, (open_id, open_count) in enumerate(counts):
+                if open_id == region_id:
+                    count = open_count
+                    counts = counts[:k] + counts[k + 1:]
+                    break
+            count += not white
+            if count > constraint or count + self.remaining[pos] < constraint:
+                return None
+            if self.remaining[pos]:
+                counts = tuple(sorted(counts + ((region_id, count),)))
+
+        # REGRA 4: janelas em andamento
+        if white:
+            if any(self.window_end[index] == pos for index in alive):
+                return None
+            alive = tuple(sorted([index for index in alive if self.window_end[index] != pos] +
+                                 self.starting[pos]))
+        else:
+            members = self.members
+            alive = tuple(index for index in alive if pos not in members[index])
+
+        # REGRA 2: componentes brancas na fronteira
+        if white:
+            if closed:
+                return None
+            if up and left and up != left:
+                rest = tuple(up if label == left else label for label in labels[1:])
+            else:
+                rest = labels[1:]
+            frontier = rest + (up or left or size + 1,)
+            if region == -1:
+                region = region_id
+            elif region != region_id:
+                region = -2
+        else:
+            frontier = labels[1:] + (0,)
+        if up and up not in frontier:
+            if any(frontier):
+                return None
+            closed = True
+
+        return canonical(frontier), closed, counts, alive, region
+
+    def accepting(self, state):
+        """Estado final válido: uma única componente branca fora de uma só região"""
+        labels, closed, _, _, region = state
+        components = len(set(labels) - {0}) + closed
+        return components == 1 and region == -2
+
+    def run(self, keep_paths=False):
+        """Percorre todas as células; retorna {estado final: número de caminhos}"""
+        total = self.size * self.size
+        layer = {((0,) * self.size, False, (), (), -1): 1}
+        self.layers = [] if keep_paths else None
+        self.peak_states = 1
+        for pos in range(total):
+            following = {}
+            parents = {} if keep_paths else None
+            for state, ways in layer.items():
+                for value in (WHITE, BLACK):
+                    new_state = self.step(state, pos, value)
+                    if new_state is None:
+                        continue
+                    following[new_state] = following.get(new_state, 0) + ways
+                    if keep_paths:
+                        parents.setdefault(new_state, []).append((state, value))
+            layer = following
+            self.peak_states = max(self.peak_states, len(layer))
+            if self.max_states is not None and len(layer) > self.max_states:
+                raise SearchLimitReached(len(layer), 'states')
+            if keep_paths:
+                self.layers.append(parents)
+        return {state: ways for state, ways in layer.items() if self.accepting(state)}
+
+    def count(self):
+        """Número exato de soluções"""
+        return sum(self.run().values())
+
+    def solutions(self, limit=1):
+        """Até limit soluções distintas (grades), reconstruídas de trás para frente"""
+        finals = self.run(keep_paths=True)
+        size = self.size
+        found = []
+        values = [0] * (size * size)
+
+        def walk(state, pos):
+            if len(found) >= limit:
+                return
+            if pos < 0:
+                found.append([values[i * size:(i + 1) * size] for i in range(size)])
+                return
+            for parent, value in self.layers[pos][state]:
+                values[pos] = value
+                walk(parent, pos - 1)
+
+        for state in finals:
+            walk(state, size * size - 1)
+        return found
+
+    def count_solutions(self, limit=2):
+        """Mesma interface do solver: contagem (até limit) e grades em game.solutions"""
+        self.game.solutions = self.solutions(limit)
+        return len(self.game.solutions)
+
+    def solve(self):
+        """Preenche a grade do solver com uma solução; False se não houver"""
+        found = self.solutions(1)
+        if not found:
+            return False
+        self.game.grid = found[0]
+        self.game.sync_state()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conta soluções Heyawake por DP de perfil")
+    parser.add_argument('--size', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', action='store_true', help="também conta com a busca")
+    args = parser.parse_args()
+
+    game = create_solver(args.size, rng=random.Random(args.seed))
+    spec = game.export_puzzle()
+    dp = ProfileSolver(game)
+    start_time = time.perf_counter()
+    count = dp.count()
+    elapsed = time.perf_counter() - start_time
+    print(f"DP: soluções={count:,} estados(pico)={dp.peak_states:,} tempo={elapsed:.3f}s")
+    if count and dp.solve():
+        game.display("SOLUÇÃO (DP)")
+        print(game.validate_solution()[1])
+
+    if args.compare:
+        other = create_solver(region_map=spec['region_map'], constraints=spec['constraints'])
+        other.set_progress(None)
+        start_time = time.perf_counter()
+        found = other.count_solutions(limit=10 ** 9)
+        elapsed = time.perf_counter() - start_time
+        print(f"Busca: soluções={found:,} nós={other.attempts:,} tempo={elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+import argparse
+import heapq
+import random
+import sys
+import time
+
+from novo import create_solver
+
+# Backend SAT: o tabuleiro vira CNF (variável r * size + c + 1 verdadeira =
+# célula preta) e é resolvido por um CDCL em Python puro.
+#   REGRA 1 - cláusulas binárias para cada par de vizinhos;
+#   REGRA 3 - contador sequencial (Sinz) para "exatamente N" por região;
+#   REGRA 4 - cada janela de 3 regiões precisa de ao menos uma preta;
+#   REGRA 2 - cortes preguiçosos: quando o modelo tem brancas desconectadas,
+#             proíbe-se aquele cerco de pretas e o laço continua.
+
+
+def luby(i):
+    """i-ésimo termo (a partir de 1) da sequência de Luby: 1 1 2 1 1 2 4 ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CDCLSolver:
+    """
+    CDCL com dois literais vigiados, aprendizado 1-UIP, VSIDS com heap
+    preguiçoso, salvamento de fase e reinícios de Luby. Literais seguem a
+    convenção DIMACS (inteiros não nulos; negativo = negado).
+    """
+
+    def __init__(self, num_vars, clauses=()):
+        self.num_vars = 0
+        self.clauses = []
+        self.watches = {}
+        self.value = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.heap = []
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.ensure_vars(num_vars)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure_vars(self, num_vars):
+        for var in range(self.num_vars + 1, num_vars + 1):
+            self.value.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(False)
+            self.watches[var] = []
+            self.watches[-var] = []
+            heapq.heappush(self.heap, (0.0, var))
+        self.num_vars = max(self.num_vars, num_vars)
+
+    def lit_value(self, lit):
+        value = self.value[abs(lit)]
+        return value if lit > 0 else -value
+
+    def enqueue(self, lit, reason):
+        var = abs(lit)
+        self.value[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def add_clause(self, clause):
+        """Acrescenta uma cláusula (no nível 0); retorna False se a fórmula ficou insatisfatível"""
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        literals = []
+        for lit in clause:
+            if -lit in literals:
+                return True  # Tautologia
+            value = self.lit_value(lit)
+            if value == 1:
+                return True  # Já satisfeita no nível 0
+            if value == 0 and lit not in literals:
+                literals.append(lit)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.enqueue(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(literals)
+            index = len(self.clauses) - 1
+            self.watches[literals[0]].append(index)
+            self.watches[literals[1]].append(index)
+        return self.ok
+
+    def propagate(self):
+        """Propagação unitária; retorna o índice da cláusula em conflito ou None"""
+        clauses = self.clauses
+        watches = self.watches
+        lit_value = self.lit_value
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            watchers = watches[false_lit]
+            kept = []
+            for k, index in enumerate(watchers):
+                clause = clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if lit_value(first) == 1:
+                    kept.append(index)
+                    continue
+
+                for m in range(2, len(clause)):
+                    if lit_value(clause[m]) != -1:
+                        clause[1], clause[m] = clause[m], clause[1]
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if lit_value(first) == -1:
+                        kept.extend(watchers[k + 1:])
+                        watches[false_lit] = kept
+                        self.qhead = len(self.trail)
+                        return index
+                    self.enqueue(first, index)
+            watches[false_lit] = kept
+        return None
+
+    def bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)
+                         if self.value[v] == 0]
+            heapq.heapify(self.heap)
+
+    def analyze(self, conflict):
+        """Aprendizado 1-UIP: retorna (cláusula aprendida, nível de retorno)"""
+        seen = set()
+        learnt = [0]
+        counter = 0
+        current_level = len(self.trail_lim)
+        clause = self.clauses[conflict]
+        start = 0
+        index = len(self.trail) - 1
+        while True:
+            for q in clause[start:]:
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] == current_level:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            seen.discard(abs(lit))
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reason[abs(lit)]]
+            start = 1
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # O literal de maior nível (depois do UIP) fica vigiado na posição 1
+        best = max(range(1, len(learnt)), key=lambda i: self.level[abs(learnt[i])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.value[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch_var(self):
+        while self.heap:
+            _, var = heapq.heappop(self.heap)
+            if self.value[var] == 0:
+                return var
+        return None
+
+    def solve(self, max_conflicts=None):
+        """True (modelo em self.model), False (insatisfatível) ou None (limite de conflitos)"""
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restarts = 1
+        restart_limit = 100 * luby(restarts)
+        since_restart = 0
+        start_conflicts = self.conflicts
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.clauses.append(learnt)
+                    index = len(self.clauses) - 1
+                    self.watches[learnt[0]].append(index)
+                    self.watches[learnt[1]].append(index)
+                    self.enqueue(learnt[0], index)
+                self.var_inc /= 0.95
+
+                if max_conflicts is not None and self.conflicts - start_conflicts >= max_conflicts:
+                    self.backtrack(0)
+                    return None
+                if since_restart >= restart_limit:
+                    self.backtrack(0)
+                    restarts += 1
+                    restart_limit = 100 * luby(restarts)
+                    since_restart = 0
+            else:
+                var = self.pick_branch_var()
+                if var is None:
+                    self.model = [False] + [self.value[v] > 0 for v in range(1, self.num_vars + 1)]
+                    return True
+                self.decisions += 1
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(var if self.phase[var] else -var, None)
+
+
+class HeyawakeCNF:
+    """Codificação CNF das regras 1, 3 e 4 (e de uma consequência da 2)"""
+
+    def __init__(self, game):
+        self.size = game.size
+        self.num_vars = game.size * game.size
+        self.clauses = []
+        self.encode(game)
+
+    def var(self, row, col):
+        return row * self.size + col + 1
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def at_most(self, lits, k):
+        """Contador sequencial de Sinz: no máximo k literais verdadeiros"""
+        n = len(lits)
+        if k >= n:
+            return
+        if k == 0:
+            self.clauses.extend([-lit] for lit in lits)
+            return
+
+        s = [[self.new_var() for _ in range(k)] for _ in range(n - 1)]
+        self.clauses.append([-lits[0], s[0][0]])
+        for j in range(1, k):
+            self.clauses.append([-s[0][j]])
+        for i in range(1, n - 1):
+            self.clauses.append([-lits[i], s[i][0]])
+            self.clauses.append([-s[i - 1][0], s[i][0]])
+            for j in range(1, k):
+                self.clauses.append([-lits[i], -s[i - 1][j - 1], s[i][j]])
+                self.clauses.append([-s[i - 1][j], s[i][j]])
+            self.clauses.append([-lits[i], -s[i - 1][k - 1]])
+        self.clauses.append([-lits[n - 1], -s[n - 2][k - 1]])
+
+    def exactly(self, lits, k):
+        self.at_most(lits, k)
+        self.at_most([-lit for lit in lits], len(lits) - k)
+
+    def encode(self, game):
+        size = self.size
+        index = game.index
+
+        # REGRA 1: sem pretas ortogonalmente adjacentes
+        for pos in range(size * size):
+            row, col = divmod(pos, size)
+            for nr, nc in index.neighbours[pos]:
+                if (nr, nc) > (row, col):
+                    self.clauses.append([-self.var(row, col), -self.var(nr, nc)])
+
+        # REGRA 2 (consequência local): uma branca não pode ter só vizinhas pretas
+        for pos in range(size * size):
+            row, col = divmod(pos, size)
+            self.clauses.append([self.var(row, col)] +
+                                [-self.var(nr, nc) for nr, nc in index.neighbours[pos]])
+
+        # REGRA 3: exatamente N pretas nas regiões numeradas
+        for region in game.regions:
+            if region['constraint'] >= 0:
+                self.exactly([self.var(r, c) for r, c in region['cells']], region['constraint'])
+
+        # REGRA 4: toda janela de 3 regiões tem ao menos uma preta
+        for cells in index.window_cells:
+            self.clauses.append([self.var(r, c) for r, c in cells])
+
+    def to_dimacs(self, stream):
+        """Exporta no formato DIMACS para solvers externos"""
+        stream.write(f"p cnf {self.num_vars} {len(self.clauses)}\n")
+        for clause in self.clauses:
+            stream.write(" ".join(map(str, clause)) + " 0\n")
+
+
+def white_components(game, grid):
+    """Componentes conexas de brancas (listas de (r, c))"""
+    size = game.size
+    seen = set()
+    components = []
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] != 1 or (i, j) in seen:
+                continue
+            component = [(i, j)]
+            seen.add((i, j))
+            for r, c in component:
+                for nr, nc in game.index.neighbours[r * size + c]:
+                    if grid[nr][nc] == 1 and (nr, nc) not in seen:
+                        seen.add((nr, nc))
+                        component.append((nr, nc))
+            components.append(component)
+    return components
+
+
+def solve_sat(game, max_rounds=10000):
+    """
+    Resolve o tabuleiro com o CDCL, acrescentando cortes de conectividade
+    até o modelo ser uma solução válida. Em caso de sucesso a grade do
+    solver é preenchida. Retorna (resolvido, estatísticas).
+    """
+    start_time = time.perf_counter()
+    cnf = HeyawakeCNF(game)
+    solver = CDCLSolver(cnf.num_vars, cnf.clauses)
+    size = game.size
+    stats = {'variables': cnf.num_vars, 'clauses': len(cnf.clauses), 'rounds': 0, 'cuts': 0}
+    solved = False
+
+    while stats['rounds'] < max_rounds and solver.solve():
+        stats['rounds'] += 1
+        model = solver.model
+        grid = [[2 if model[cnf.var(i, j)] else 1 for j in range(size)] for i in range(size)]
+        components = white_components(game, grid)
+
+        if len(components) == 1:
+            game.grid = grid
+            game.sync_state()
+            if game.validate_solution()[0]:
+                solved = True
+                break
+            # Modelo viola outra regra (REGRA 5): bloqueia esta grade
+            solver.add_clause([-cnf.var(i, j) if model[cnf.var(i, j)] else cnf.var(i, j)
+                               for i in range(size) for j in range(size)])
+            continue
+
+        # Corte: as pretas que cercam cada componente não podem estar
+        # todas pretas enquanto ela e outra componente tiverem brancas
+        for k, component in enumerate(components):
+            members = set(component)
+            fence = {(nr, nc) for r, c in component
+                     for nr, nc in game.index.neighbours[r * size + c] if (nr, nc) not in members}
+            inside = component[0]
+            outside = components[(k + 1) % len(components)][0]
+            solver.add_clause([-cnf.var(r, c) for r, c in sorted(fence)] +
+                              [cnf.var(*inside), cnf.var(*outside)])
+            stats['cuts'] += 1
+
+    if not solved:
+        game.grid = [[0] * size for _ in range(size)]
+        game.sync_state()
+    stats['conflicts'] = solver.conflicts
+    stats['decisions'] = solver.decisions
+    stats['time'] = time.perf_counter() - start_time
+    return solved, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve Heyawake via SAT (CDCL embutido)")
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dimacs', help="exporta a CNF (sem cortes) para este arquivo ('-' = stdout)")
+    parser.add_argument('--compare', action='store_true', help="também resolve com backtracking")
+    args = parser.parse_args()
+
+    game = create_solver(args.size, rng=random.Random(args.seed))
+    if args.dimacs:
+        cnf = HeyawakeCNF(game)
+        if args.dimacs == '-':
+            cnf.to_dimacs(sys.stdout)
+        else:
+            with open(args.dimacs, 'w') as f:
+                cnf.to_dimacs(f)
+        return
+
+    spec = game.export_puzzle()
+    solved, stats = solve_sat(game)
+    print(f"SAT: resolvido={solved} variáveis={stats['variables']} cláusulas={stats['clauses']} "
+          f"rodadas={stats['rounds']} cortes={stats['cuts']} conflitos={stats['conflicts']} "
+          f"tempo={stats['time']:.3f}s")
+    if solved:
+        game.display("SOLUÇÃO SAT")
+
+    if args.compare:
+        other = create_solver(region_map=spec['region_map'], constraints=spec['constraints'])
+        other.set_progress(None)
+        start_time = time.perf_counter()
+        result = other.solve_iterative()
+        elapsed = time.perf_counter() - start_time
+        print(f"Backtracking: resolvido={result} nós={other.attempts:,} tempo={elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
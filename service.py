@@ -0,0 +1,477 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import solution_problem, solve_spec, solver_from_spec, spec_problem
+from cache import SolutionCache, fingerprint, from_canonical, to_canonical
+from generator import PuzzleGenerator, puzzle_to_json
+from unique import UniquePuzzleGenerator
+
+# Serviço local de resolução: HTTP mínimo (uma requisição por conexão) num
+# socket Unix ou em localhost, com uma fila limitada de jobs que alimenta um
+# pool de processos.
+#
+#   POST /jobs     {"type": "solve", "spec": {...}, "timeout": 5, "stream": true}
+#                  {"type": "generate", "size": 8, "count": 3, "seed": 1}
+#                  {"type": "validate", "spec": {...}, "solution": [[...]]}
+#   GET  /metrics  profundidade da fila, latência p50/p99, nós/s, ...
+#   GET  /health
+#
+# Fila cheia → 503 com Retry-After. Com "stream": true a resposta é NDJSON:
+# eventos 'queued' e 'progress' (tentativas/backtracks do worker) e por fim
+# 'result'. Solves do mesmo tabuleiro (em qualquer orientação) com os mesmos
+# limites, enquanto um deles ainda está na fila ou rodando, viram um único job.
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           503: 'Service Unavailable'}
+
+
+class ProgressRelay:
+    """Callback de progresso que roda no worker e manda eventos para o servidor"""
+
+    def __init__(self, events, job_id):
+        self.events = events
+        self.job_id = job_id
+
+    def __call__(self, solver):
+        self.events.put({'event': 'progress', 'job': self.job_id,
+                         'attempts': solver.attempts, 'backtracks': solver.backtracks})
+
+
+def run_generate(job):
+    """Job de geração (no worker): lista de especificações"""
+    size = job.get('size', 8)
+    if job.get('unique'):
+        generator = UniquePuzzleGenerator(job.get('seed'), counter=job.get('counter', 'search'))
+    else:
+        generator = PuzzleGenerator(job.get('seed'))
+    return {'puzzles': [json.loads(puzzle_to_json(*puzzle))
+                        for puzzle in generator.iter_puzzles(size, job.get('count', 1))]}
+
+
+def run_validate(job):
+    """Job de validação (no worker)"""
+    game = solver_from_spec(job['spec'])
+    solution = job.get('solution')
+    problem = solution_problem(solution, game.size)
+    if problem is not None:
+        return {'valid': False, 'message': problem}
+    game.grid = [list(row) for row in solution]
+    valid, message = game.validate_solution()
+    return {'valid': valid, 'message': message}
+
+
+def check_job(payload):
+    """Levanta ValueError se o job não tiver a forma esperada (vira 400)"""
+    if not isinstance(payload, dict):
+        raise ValueError("O job precisa ser um objeto JSON")
+    kind = payload.get('type', 'solve')
+    if kind not in ('solve', 'generate', 'validate'):
+        raise ValueError(f"Tipo de job desconhecido: {kind!r}")
+    for name in ('timeout', 'node_limit'):
+        value = payload.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"'{name}' precisa ser um número")
+    if kind == 'generate':
+        return
+    if 'spec' not in payload:
+        raise ValueError("Job sem 'spec'")
+    problem = spec_problem(payload['spec'])
+    if problem is not None:
+        raise ValueError(problem)
+
+
+def percentile(values, fraction):
+    """Percentil por posto mais próximo (None sem amostras)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Job:
+    def __init__(self, job_id, payload, timeout=None):
+        self.id = job_id
+        self.payload = payload
+        self.kind = payload.get('type', 'solve')
+        self.created = time.monotonic()
+        self.deadline = None if timeout is None else self.created + timeout
+        self.future = asyncio.get_running_loop().create_future()
+        self.key = None
+        self.symmetry = 0
+
+
+class SolverService:
+    """
+    Fila de jobs e pool de processos. workers dispatchers tiram jobs da fila
+    (no máximo queue_size esperando) e os rodam no pool; o prazo de cada job
+    conta desde a chegada, então o tempo na fila também gasta o timeout.
+    """
+
+    def __init__(self, workers=None, queue_size=64, progress_interval=20000, cache_path=None,
+                 strategy='row-major', latency_window=1000):
+        self.workers = workers or os.cpu_count()
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+        self.cache = SolutionCache(cache_path) if cache_path else None
+        self.strategy = strategy
+        self.queue = None
+        self.executor = None
+        self.manager = None
+        self.events = None
+        self.ids = itertools.count(1)
+        self.pending = {}        # chave do tabuleiro → job líder
+        self.subscribers = {}    # id do job → filas de eventos dos clientes em stream
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {'accepted': 0, 'rejected': 0, 'coalesced': 0, 'completed': 0,
+                         'failed': 0, 'running': 0, 'nodes': 0}
+        self.solve_time = 0.0
+        self.started = time.monotonic()
+        self._tasks = []
+        self._relay = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        # Workers criados por spawn: um fork no meio de uma requisição herdaria o
+        # socket do cliente, que então nunca veria a conexão fechar
+        context = multiprocessing.get_context('spawn')
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        self.manager = context.Manager()
+        self.events = self.manager.Queue()
+        self._relay = threading.Thread(target=self._pump_events, args=(loop,), daemon=True)
+        self._relay.start()
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.events.put(None)
+        self._relay.join()
+        self.executor.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+    def _pump_events(self, loop):
+        """Thread que repassa eventos de progresso dos workers ao loop"""
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            loop.call_soon_threadsafe(self._publish, event)
+
+    def _publish(self, event):
+        for events in self.subscribers.get(event['job'], ()):
+            events.put_nowait(event)
+
+    def submit(self, payload):
+        """
+        Enfileira um job e devolve (job, líder): com coalescência o líder é o
+        job já pendente do mesmo tabuleiro. Levanta asyncio.QueueFull.
+        """
+        job = Job(next(self.ids), payload, payload.get('timeout'))
+        if job.kind == 'solve':
+            spec = payload['spec']
+            if 'region_map' in spec:
+                size = spec.get('size', len(spec['region_map']))
+                board, job.symmetry = fingerprint(size, spec['region_map'], spec['constraints'])
+            else:
+                board = f"seed:{spec['size']}:{spec['seed']}"
+            job.key = (board, payload.get('timeout'), payload.get('node_limit'))
+            leader = self.pending.get(job.key)
+            if leader is not None:
+                self.counters['coalesced'] += 1
+                return job, leader
+
+        self.queue.put_nowait(job)
+        self.counters['accepted'] += 1
+        if job.key is not None:
+            self.pending[job.key] = job
+        return job, job
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            self.counters['running'] += 1
+            try:
+                result = await loop.run_in_executor(self.executor, *self._call(job))
+                self.counters['completed'] += 1
+                if job.kind == 'solve':
+                    self.counters['nodes'] += result['attempts']
+                    self.solve_time += result['time']
+                job.future.set_result(result)
+            except Exception as error:
+                self.counters['failed'] += 1
+                job.future.set_exception(error)
+            finally:
+                self.counters['running'] -= 1
+                self.pending.pop(job.key, None)
+                self.latencies.append(time.monotonic() - job.created)
+
+    def _call(self, job):
+        """Função e argumentos que rodam no pool para o job"""
+        payload = job.payload
+        if job.kind == 'generate':
+            return run_generate, payload
+        if job.kind == 'validate':
+            return run_validate, payload
+
+        timeout = None
+        if job.deadline is not None:
+            # Um prazo já vencido na fila ainda chega ao worker, que para no primeiro checkpoint
+            timeout = max(job.deadline - time.monotonic(), 0.0)
+        streaming = job.id in self.subscribers
+        return (solve_spec, job.id, payload['spec'], timeout,
+                payload.get('strategy', self.strategy), payload.get('backend', 'list'),
+                self.progress_interval if streaming else None,
+                ProgressRelay(self.events, job.id) if streaming else None,
+                self.cache, payload.get('node_limit'))
+
+    def follow(self, job, leader, result):
+        """Resultado do líder visto por um job coalescido (solução na orientação dele)"""
+        if job is leader:
+            return result
+        result = dict(result, index=job.id, spec=job.payload['spec'], coalesced=True)
+        if result['solution'] is not None:
+            size = len(result['solution'])
+            canonical = to_canonical(size, result['solution'], leader.symmetry)
+            result['solution'] = from_canonical(size, canonical, job.symmetry)
+        return result
+
+    def metrics(self):
+        latencies = list(self.latencies)
+        return dict(self.counters,
+                    queue_depth=self.queue.qsize(),
+                    queue_size=self.queue_size,
+                    workers=self.workers,
+                    latency_p50=percentile(latencies, 0.50),
+                    latency_p99=percentile(latencies, 0.99),
+                    nodes_per_sec=self.counters['nodes'] / self.solve_time if self.solve_time else 0.0,
+                    uptime=time.monotonic() - self.started)
+
+    # --- HTTP ---
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError):
+            await respond(writer, 400, {'error': "Requisição HTTP inválida"})
+            return
+        try:
+            if path == '/health':
+                await respond(writer, 200, {'status': 'ok'})
+            elif path == '/metrics':
+                await respond(writer, 200, self.metrics())
+            elif path != '/jobs':
+                await respond(writer, 404, {'error': f"Caminho desconhecido: {path}"})
+            elif method != 'POST':
+                await respond(writer, 405, {'error': "Use POST em /jobs"})
+            else:
+                await self.handle_job(writer, body)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_job(self, writer, body):
+        try:
+            payload = json.loads(body or b'{}')
+            check_job(payload)
+        except ValueError as error:
+            await respond(writer, 400, {'error': str(error)})
+            return
+
+        stream = bool(payload.get('stream'))
+        events = asyncio.Queue() if stream else None
+        try:
+            job, leader = self.submit(payload)
+        except asyncio.QueueFull:
+            self.counters['rejected'] += 1
+            await respond(writer, 503, {'error': "Fila cheia", 'queue_depth': self.queue.qsize()},
+                          {'Retry-After': '1'})
+            return
+
+        if not stream:
+            try:
+                result = self.follow(job, leader, await asyncio.shield(leader.future))
+            except Exception as error:
+                await respond(writer, 200, {'job': job.id, 'status': 'error', 'error': str(error)})
+                return
+            await respond(writer, 200, dict(result, job=job.id))
+            return
+
+        self.subscribers.setdefault(leader.id, []).append(events)
+        try:
+            await respond_stream(writer, {'event': 'queued', 'job': job.id, 'leader': leader.id,
+                                          'queue_depth': self.queue.qsize()})
+            while not leader.future.done():
+                getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({getter, leader.future},
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    await write_line(writer, dict(getter.result(), job=job.id))
+                else:
+                    getter.cancel()
+            try:
+                result = self.follow(job, leader, leader.future.result())
+                await write_line(writer, dict(result, event='result', job=job.id))
+            except Exception as error:
+                await write_line(writer, {'event': 'error', 'job': job.id, 'error': str(error)})
+        finally:
+            listeners = self.subscribers.get(leader.id, [])
+            listeners.remove(events)
+            if not listeners:
+                self.subscribers.pop(leader.id, None)
+
+
+async def read_request(reader):
+    """(método, caminho, corpo) de uma requisição HTTP/1.x"""
+    request_line = (await reader.readline()).decode('latin-1').split()
+    if len(request_line) != 3:
+        raise ValueError(request_line)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return request_line[0].upper(), request_line[1].split('?')[0], body
+
+
+def _head(status, content_type, extra=None):
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}",
+             "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (extra or {}).items()]
+    return lines
+
+
+async def respond(writer, status, payload, extra=None):
+    body = json.dumps(payload).encode()
+    head = _head(status, 'application/json', extra) + [f"Content-Length: {len(body)}"]
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+
+
+async def respond_stream(writer, first_event):
+    """Cabeçalho de uma resposta NDJSON sem tamanho (termina quando a conexão fecha)"""
+    writer.write(('\r\n'.join(_head(200, 'application/x-ndjson')) + '\r\n\r\n').encode())
+    await write_line(writer, first_event)
+
+
+async def write_line(writer, event):
+    writer.write(json.dumps(event, separators=(',', ':')).encode() + b'\n')
+    await writer.drain()
+
+
+async def request(method, path, payload=None, unix=None, host='127.0.0.1', port=8765):
+    """
+    Cliente mínimo: (status, linhas da resposta decodificadas). Uma conexão
+    fechada sem resposta dá status 0 e nenhuma linha.
+    """
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    try:
+        status_line = (await reader.readline()).split()
+    except ConnectionError:
+        status_line = []
+    if len(status_line) < 2:
+        writer.close()
+        return 0, []
+    status = int(status_line[1])
+    while (await reader.readline()).strip():
+        pass
+    lines = []
+    async for line in reader:
+        if line.strip():
+            lines.append(json.loads(line))
+    writer.close()
+    return status, lines
+
+
+async def serve(args):
+    service = SolverService(args.workers, args.queue_size, args.progress_interval, args.cache,
+                            args.strategy)
+    await service.start()
+    if args.unix:
+        server = await asyncio.start_unix_server(service.handle, path=args.unix)
+        where = args.unix
+    else:
+        server = await asyncio.start_server(service.handle, args.host, args.port)
+        where = f"http://{args.host}:{args.port}"
+    print(f"Servindo em {where} ({service.workers} workers, fila {service.queue_size})",
+          file=sys.stderr, flush=True)
+    stopping = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stopping.set)
+    try:
+        async with server:
+            await stopping.wait()
+    finally:
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+        await service.stop()
+
+
+async def submit(args):
+    if args.path == '/jobs':
+        payload = json.load(sys.stdin)
+        status, lines = await request('POST', '/jobs', payload, args.unix, args.host, args.port)
+    else:
+        status, lines = await request('GET', args.path, None, args.unix, args.host, args.port)
+    if not status:
+        print("Conexão fechada sem resposta", file=sys.stderr)
+    for line in lines:
+        print(json.dumps(line))
+    return 0 if status == 200 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de resolução Heyawake")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_address(command):
+        command.add_argument('--unix', help="caminho do socket Unix (em vez de TCP)")
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, default=8765)
+
+    server = commands.add_parser('serve', help="sobe o serviço")
+    add_address(server)
+    server.add_argument('--workers', type=int, default=os.cpu_count())
+    server.add_argument('--queue-size', type=int, default=64, help="jobs esperando antes do 503")
+    server.add_argument('--progress-interval', type=int, default=20000,
+                        help="tentativas entre eventos de progresso")
+    server.add_argument('--strategy', default='row-major')
+    server.add_argument('--cache', help="arquivo SQLite do cache de soluções")
+
+    client = commands.add_parser('submit', help="envia um job (JSON em stdin) ou lê um caminho")
+    add_address(client)
+    client.add_argument('path', nargs='?', default='/jobs', help="/jobs, /metrics ou /health")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        asyncio.run(serve(args))
+        return 0
+    return asyncio.run(submit(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import argparse
+import sys
+
+from generator import PuzzleGenerator, puzzle_to_json
+from novo import HeyawakeSolver, SearchLimitReached
+from profile_dp import ProfileSolver
+
+# Geração de puzzles com solução ÚNICA: cada candidato é contado até 2
+# soluções e, em vez de descartado, é consertado aos poucos:
+#   0 soluções  → remove o número de uma região numerada;
+#   2+ soluções → numera uma região onde as duas soluções diferem ou, se
+#                 todas empatam, corta uma região retangular em duas.
+# A contagem usa a busca (orçamento em nós) ou a DP de perfil (orçamento em
+# estados por camada, custo previsível).
+
+
+class UniquePuzzleGenerator:
+    def __init__(self, seed=None, node_budget=20000, max_repairs=20, strategy='slack',
+                 counter='search', max_states=100000):
+        self.generator = PuzzleGenerator(seed)
+        self.rng = self.generator.rng
+        self.node_budget = node_budget
+        self.max_repairs = max_repairs
+        self.strategy = strategy
+        self.counter = counter
+        self.max_states = max_states
+        self.accepted = 0
+        self.rejected = 0
+        self.repairs = 0
+
+    def count_solutions(self, size, region_map, constraints):
+        """Retorna (contagem até 2, soluções) ou (None, []) se estourar o orçamento"""
+        game = HeyawakeSolver(size, region_map=region_map, constraints=constraints)
+        game.set_progress(None)
+        game.limit_nodes(self.node_budget)
+        try:
+            if self.counter == 'dp':
+                count = ProfileSolver(game, self.max_states).count_solutions(2)
+            else:
+                count = game.count_solutions(2, self.strategy)
+        except SearchLimitReached:
+            return None, []
+        return count, game.solutions
+
+    def generate(self, size):
+        """Gera candidatos até aceitar um com solução única"""
+        while True:
+            _, region_map, constraints = self.generator.generate(size)
+            puzzle = self.repair(size, region_map, list(constraints))
+            if puzzle is not None:
+                self.accepted += 1
+                return puzzle
+            self.rejected += 1
+
+    def iter_puzzles(self, size, count):
+        for _ in range(count):
+            yield self.generate(size)
+
+    def repair(self, size, region_map, constraints):
+        """Conserta o candidato in loco; None se não convergir"""
+        for _ in range(self.max_repairs + 1):
+            count, solutions = self.count_solutions(size, region_map, constraints)
+            if count is None:
+                return None
+            if count == 1:
+                return size, region_map, constraints
+
+            self.repairs += 1
+            if count == 0:
+                fixed = self.relax(constraints)
+            else:
+                fixed = self.disambiguate(size, region_map, constraints, *solutions)
+            if not fixed:
+                return None
+        return None
+
+    def relax(self, constraints):
+        """Tabuleiro sem solução: tira o número de uma região"""
+        numbered = [region_id for region_id, value in enumerate(constraints) if value >= 0]
+        if not numbered:
+            return False
+        constraints[self.rng.choice(numbered)] = -1
+        return True
+
+    def disambiguate(self, size, region_map, constraints, first, second):
+        """Tabuleiro ambíguo: acrescenta uma pista que a primeira solução satisfaz e a segunda não"""
+        blacks = [[0, 0] for _ in constraints]
+        for pos, region_id in enumerate(region_map):
+            r, c = divmod(pos, size)
+            blacks[region_id][0] += first[r][c] == 2
+            blacks[region_id][1] += second[r][c] == 2
+
+        candidates = [region_id for region_id, (a, b) in enumerate(blacks)
+                      if a != b and constraints[region_id] < 0]
+        if candidates:
+            region_id = self.rng.choice(candidates)
+            constraints[region_id] = blacks[region_id][0]
+            return True
+
+        differing = sorted({region_map[r * size + c] for r in range(size) for c in range(size)
+                            if first[r][c] != second[r][c]})
+        self.rng.shuffle(differing)
+        for region_id in differing:
+            if self.split_region(size, region_map, constraints, region_id, first, second):
+                return True
+        return False
+
+    def split_region(self, size, region_map, constraints, region_id, first, second):
+        """
+        Corta uma região retangular em duas por uma linha reta, escolhendo
+        um corte em que as soluções diferem numa das metades; as metades
+        recebem os números da primeira solução.
+        """
+        cells = [divmod(pos, size) for pos, value in enumerate(region_map) if value == region_id]
+        top, left = cells[0]
+        bottom, right = cells[-1]
+        if len(cells) != (bottom - top + 1) * (right - left + 1):
+            return False
+
+        cuts = [('row', k) for k in range(top + 1, bottom + 1)]
+        cuts += [('col', k) for k in range(left + 1, right + 1)]
+        self.rng.shuffle(cuts)
+        for axis, k in cuts:
+            piece = [(r, c) for r, c in cells if (r if axis == 'row' else c) >= k]
+            piece_a = sum(first[r][c] == 2 for r, c in piece)
+            piece_b = sum(second[r][c] == 2 for r, c in piece)
+            if piece_a == piece_b:
+                continue
+
+            new_id = len(constraints)
+            for r, c in piece:
+                region_map[r * size + c] = new_id
+            rest_a = sum(first[r][c] == 2 for r, c in cells) - piece_a
+            if constraints[region_id] >= 0:
+                constraints[region_id] = rest_a
+            constraints.append(piece_a)
+            return True
+        return False
+
+    def report(self):
+        ratio = self.rejected / self.accepted if self.accepted else float('inf')
+        return (f"aceitos: {self.accepted}, rejeitados: {self.rejected} "
+                f"({ratio:.2f} por aceito), consertos: {self.repairs}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera puzzles Heyawake com solução única")
+    parser.add_argument('--size', type=int, default=6)
+    parser.add_argument('--count', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--node-budget', type=int, default=20000)
+    parser.add_argument('--max-repairs', type=int, default=20)
+    parser.add_argument('--counter', choices=['search', 'dp'], default='search')
+    parser.add_argument('--max-states', type=int, default=100000)
+    args = parser.parse_args()
+
+    generator = UniquePuzzleGenerator(args.seed, args.node_budget, args.max_repairs,
+                                      counter=args.counter, max_states=args.max_states)
+    for puzzle in generator.iter_puzzles(args.size, args.count):
+        print(puzzle_to_json(*puzzle), flush=True)
+    print(generator.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()